@@ -12,7 +12,9 @@ from app.config import config_by_name, flask_env
 from app.database import db
 from app.documents import api_routes
 from app.documents.namespace import api as documents_ns
-from app.extensions import bcrypt, jwt, cache
+from app.extensions import bcrypt, jwt, cache, redis_client
+from app.jobs import api_routes
+from app.jobs.namespace import api as jobs_ns
 from app.system import api_routes
 from app.system.namespace import api as system_ns
 from app.tfidf.routes import tfidf_bp
@@ -43,6 +45,7 @@ def create_app():
     bcrypt.init_app(app)
     jwt.init_app(app)
     cache.init_app(app)
+    redis_client.init_app(app)
 
     from app.system.models import DocumentMetricModel
     from app.collections.models import CollectionModel
@@ -68,6 +71,7 @@ def create_app():
     api.add_namespace(documents_ns, path="/api/documents")
     api.add_namespace(collections_ns, path="/api/collections")
     api.add_namespace(system_ns, path="/api/system")
+    api.add_namespace(jobs_ns, path="/api/jobs")
 
     app.register_blueprint(tfidf_bp, url_prefix="/tfidf")
     app.register_blueprint(admin_bp, url_prefix="/admin")
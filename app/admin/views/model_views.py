@@ -12,7 +12,8 @@ class UserModelView(BaseReadOnlyModelView):
 
 class DocumentModelView(BaseReadOnlyModelView):
     form_columns = [
-        "name", "contents", "content_hash", "user_id", "collections"
+        "name", "contents", "content_hash", "raw_content_hash", "user_id",
+        "collections"
     ]
     column_list = ["id", "name", "user_id", "collections", "created_at"]
     column_searchable_list = ["name", "contents", "user_id"]
@@ -23,6 +23,24 @@ statistics_response = api.model("CollectionStatistics", {
     "message": fields.String
 })
 
+job_response = api.model("CollectionStatisticsJob", {
+    "job_id": fields.String,
+    "status": fields.String
+})
+
+document_statistics_response = api.model("CollectionDocumentStatistics", {
+    "document_id": fields.Integer,
+    "tf": fields.Raw,
+    "idf": fields.Raw,
+    "tf_idf": fields.Raw
+})
+
+documents_statistics_response = api.model("CollectionDocumentsStatistics", {
+    "collection_id": fields.Integer,
+    "documents": fields.List(fields.Nested(document_statistics_response)),
+    "message": fields.String
+})
+
 message_model = api.model("Message", {
     "message": fields.String
 })
@@ -1,23 +1,59 @@
 from flask import request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Resource, fields
+from flask_restx import Resource, fields, inputs
 
 from app.collections.api_models import (
-    collection_response, collection_input, message_model, statistics_response
+    collection_response, collection_input, message_model, statistics_response,
+    documents_statistics_response, job_response
 )
 from app.collections.decorators import (
-    ensure_user_collection_exists, ensure_user_document_exists,
-    ensure_document_not_in_collection, ensure_document_in_collection,
-    check_collection_not_exists
+    ensure_user_collection_exists, check_collection_not_exists,
+    authorize_collection_document
 )
 from app.collections.namespace import api
 from app.collections.selectors import (
-    get_collections_list, get_documents_by_collection_id, get_collection_stats
+    get_collections_page, get_documents_by_collection_id,
+    get_collection_stats_response, is_collection_term_matrix_cached,
+    get_documents_page_by_collection_id, get_collection_documents_stats
 )
 from app.collections.services.crud import (
     add_document_to_collection, delete_document_from_collection,
     add_collection, remove_collection, update_collection_name
 )
+from app.collections.services.statistics import start_collection_stats_job
+from app.users.services import current_user_id
+
+
+def create_pagination_parser(items: str):
+    parser = api.parser()
+    parser.add_argument(
+        "after",
+        type=int,
+        location="args",
+        help=f"Return only {items} with greater identifiers"
+    )
+    parser.add_argument(
+        "limit",
+        type=inputs.int_range(1, 100),
+        default=20,
+        location="args",
+        help=f"Maximum number of {items} to return (1-100)"
+    )
+
+    return parser
+
+
+pagination_parser = create_pagination_parser("documents")
+collections_pagination_parser = create_pagination_parser("collections")
+
+statistics_parser = api.parser()
+statistics_parser.add_argument(
+    "async",
+    type=inputs.boolean,
+    default=False,
+    location="args",
+    help="Compute statistics in background if they are not cached yet"
+)
 
 
 class SecuredResource(Resource):
@@ -26,8 +62,12 @@ class SecuredResource(Resource):
 
 @api.route("")
 class CollectionListResource(SecuredResource):
+    @api.expect(collections_pagination_parser)
     @api.doc(
-        description="Get list of user collections and documents in them",
+        description="Get list of user collections and documents in them, "
+                    "paginated by collection identifier. When there may be "
+                    "more collections, the `X-Next-After` header holds the "
+                    "value to pass as `after` to get the next page",
         security="BearerAuth",
         responses={
             200: ("Success", [collection_response]),
@@ -36,24 +76,17 @@ class CollectionListResource(SecuredResource):
     )
     def get(self):
         """List current user's collections with documents in them"""
-        username = get_jwt_identity()
-        collections = get_collections_list(username)
+        args = collections_pagination_parser.parse_args()
+        user_id = current_user_id()
+        collections = get_collections_page(
+            user_id, args["after"], args["limit"]
+        )
 
-        if not collections:
-            return [], 200
+        if len(collections) == args["limit"]:
+            next_after = collections[-1]["collection_id"]
+            return collections, 200, {"X-Next-After": str(next_after)}
 
-        result = []
-        for collection in collections:
-            documents = [{
-                "document_id": document.document.id,
-                "document_name": document.document.name}
-                for document in collection.documents
-            ]
-            result.append(
-                {"collection_id": collection.id, "documents": documents}
-            )
-
-        return result, 200
+        return collections, 200
 
     @api.doc(
         description="Create a new collection. **Note:** Clients must send "
@@ -70,9 +103,9 @@ class CollectionListResource(SecuredResource):
     @check_collection_not_exists
     def post(self):
         """Create a new collection"""
-        username = get_jwt_identity()
+        user_id = current_user_id()
         collection_name = request.json.get("collection_name")
-        collection = add_collection(username, collection_name)
+        collection = add_collection(user_id, collection_name)
 
         return {
             "message": f"Collection with id = {collection.id} was created"
@@ -115,9 +148,9 @@ class CollectionDocumentsResource(SecuredResource):
     @check_collection_not_exists
     def patch(self, collection_id):
         """Update collection name"""
-        username = get_jwt_identity()
+        user_id = current_user_id()
         collection_name = request.json.get("collection_name")
-        update_collection_name(username, collection_id, collection_name)
+        update_collection_name(user_id, collection_id, collection_name)
 
         return {"message": f"Collection was updated"}, 201
 
@@ -137,8 +170,8 @@ class CollectionDocumentsResource(SecuredResource):
     @ensure_user_collection_exists
     def delete(self, collection_id):
         """Delete collection"""
-        username = get_jwt_identity()
-        remove_collection(username, collection_id)
+        user_id = current_user_id()
+        remove_collection(user_id, collection_id)
 
         return {"message": "Collection was deleted"}, 200
 
@@ -146,29 +179,74 @@ class CollectionDocumentsResource(SecuredResource):
 @api.route("/<int:collection_id>/statistics")
 @api.param("collection_id", "The collection identifier")
 class CollectionStatisticsResource(SecuredResource):
+    @api.expect(statistics_parser)
     @api.doc(
-        description="Get TF-IDF statistics for a collection",
+        description="Get TF-IDF statistics for a collection. With "
+                    "`async=true`, statistics that are not cached yet are "
+                    "computed in background and a job is returned, poll "
+                    "`/api/jobs/<job_id>` for its result",
         security="BearerAuth",
         responses={
             200: ("Success", statistics_response),
+            202: ("Statistics job was started", job_response),
             401: ("Missing JWT in headers or cookie", message_model),
         }
     )
     @ensure_user_collection_exists
     def get(self, collection_id):
         """Get collection TF-IDF statistics"""
-        number_of_documents, tf, idf = get_collection_stats(collection_id)
-        response = {"collection_id": collection_id}
+        args = statistics_parser.parse_args()
+
+        if args["async"] and not is_collection_term_matrix_cached(
+            collection_id
+        ):
+            username = get_jwt_identity()
+            job = start_collection_stats_job(username, collection_id)
+            location = f"/api/jobs/{job['job_id']}"
+
+            return {
+                "job_id": job["job_id"], "status": job["status"]
+            }, 202, {"Location": location}
+
+        return get_collection_stats_response(collection_id), 200
+
+
+@api.route("/<int:collection_id>/documents/statistics")
+@api.param("collection_id", "The collection identifier")
+class CollectionDocumentsStatisticsResource(SecuredResource):
+    @api.expect(pagination_parser)
+    @api.doc(
+        description="Get TF-IDF statistics for every document in a "
+                    "collection, paginated by document identifier. When "
+                    "there are more documents, the `X-Next-After` header "
+                    "holds the value to pass as `after` to get the next page",
+        security="BearerAuth",
+        responses={
+            200: ("Success", documents_statistics_response),
+            401: ("Missing JWT in headers or cookie", message_model),
+            404: ("User does not have such collection", message_model)
+        }
+    )
+    @ensure_user_collection_exists
+    def get(self, collection_id):
+        """Get TF-IDF statistics for documents in collection"""
+        args = pagination_parser.parse_args()
+        document_ids = get_documents_page_by_collection_id(
+            collection_id, args["after"], args["limit"]
+        )
+        number_of_documents, documents = get_collection_documents_stats(
+            collection_id, document_ids
+        )
+        response = {"collection_id": collection_id, "documents": documents}
 
         if number_of_documents == 0:
             response["message"] = "No documents in collection were found"
         elif number_of_documents == 1:
-            response["tf"] = tf
             response["message"] = ("There is only one document in this "
                                    "collection, IDF is unavailable")
-        else:
-            response["tf"] = tf
-            response["idf"] = idf
+
+        if len(document_ids) == args["limit"]:
+            return response, 200, {"X-Next-After": str(document_ids[-1])}
 
         return response, 200
 
@@ -190,12 +268,10 @@ class CollectionDocumentResource(SecuredResource):
             409: ("Document already exists in this collection", message_model),
         }
     )
-    @ensure_user_collection_exists
-    @ensure_user_document_exists
-    @ensure_document_not_in_collection
-    def post(self, collection_id, document_id):
+    @authorize_collection_document(expect_linked=False)
+    def post(self, collection_id, document_id, access):
         """Add document to collection"""
-        add_document_to_collection(collection_id, document_id)
+        add_document_to_collection(access)
         return {"message": "Document was added to collection"}, 201
 
     @api.doc(
@@ -211,10 +287,8 @@ class CollectionDocumentResource(SecuredResource):
             409: ("Document is not part of this collection", message_model),
         }
     )
-    @ensure_user_collection_exists
-    @ensure_user_document_exists
-    @ensure_document_in_collection
-    def delete(self, collection_id, document_id):
+    @authorize_collection_document(expect_linked=True)
+    def delete(self, collection_id, document_id, access):
         """Remove document from collection"""
-        delete_document_from_collection(collection_id, document_id)
+        delete_document_from_collection(access)
         return {"message": "Document was deleted from this collection"}, 200
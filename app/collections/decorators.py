@@ -1,23 +1,21 @@
 from functools import wraps
 
 from flask import request
-from flask_jwt_extended import get_jwt_identity
 
 from app.collections.services.checks import (
-    user_collection_exists, user_document_exists,
-    document_in_collection_exists, user_collection_with_name_exists
+    user_collection_exists, user_collection_with_name_exists,
+    get_collection_document_access
 )
-from app.users.services import get_user_by_username
+from app.users.services import current_user_id
 
 
 def ensure_user_collection_exists(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         collection_id = kwargs.get("collection_id")
-        username = get_jwt_identity()
-        user = get_user_by_username(username)
+        user_id = current_user_id()
 
-        if not user_collection_exists(user, collection_id):
+        if not user_collection_exists(user_id, collection_id):
             return {"message": "This user does not have such collection"}, 404
         return func(*args, **kwargs)
     return wrapper
@@ -27,53 +25,42 @@ def check_collection_not_exists(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         collection_name = request.json.get("collection_name")
-        username = get_jwt_identity()
-        user = get_user_by_username(username)
+        user_id = current_user_id()
 
-        if user_collection_with_name_exists(user, collection_name):
+        if user_collection_with_name_exists(user_id, collection_name):
             return {"message": "Collection with this name already exists"}, 409
 
         return func(*args, **kwargs)
     return wrapper
 
 
-def ensure_user_document_exists(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        document_id = kwargs.get("document_id")
-        username = get_jwt_identity()
-        user = get_user_by_username(username)
-
-        if not user_document_exists(user, document_id):
-            return {"message": "This user does not have such document"}, 404
-        return func(*args, **kwargs)
-    return wrapper
-
-
-def ensure_document_not_in_collection(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        collection_id = kwargs.get("collection_id")
-        document_id = kwargs.get("document_id")
-
-        if document_in_collection_exists(collection_id, document_id):
-            return {
-                "message": "This document already exists in this collection"
-            }, 409
-        return func(*args, **kwargs)
-    return wrapper
-
-
-def ensure_document_in_collection(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        collection_id = kwargs.get("collection_id")
-        document_id = kwargs.get("document_id")
-
-        if not document_in_collection_exists(collection_id, document_id):
-            return {
-                "message": "This document is not part of this collection"
-            }, 409
-        return func(*args, **kwargs)
-
-    return wrapper
+def authorize_collection_document(expect_linked: bool):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            access = get_collection_document_access(
+                current_user_id(),
+                kwargs.get("collection_id"),
+                kwargs.get("document_id")
+            )
+
+            if not access.owns_collection:
+                return {
+                    "message": "This user does not have such collection"
+                }, 404
+            if not access.owns_document:
+                return {
+                    "message": "This user does not have such document"
+                }, 404
+            if access.linked and not expect_linked:
+                return {
+                    "message": "This document already exists in this "
+                               "collection"
+                }, 409
+            if not access.linked and expect_linked:
+                return {
+                    "message": "This document is not part of this collection"
+                }, 409
+            return func(*args, access=access, **kwargs)
+        return wrapper
+    return decorator
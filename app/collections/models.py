@@ -20,9 +20,34 @@ class CollectionModel(db.Model):
         cascade="all, delete-orphan",
         back_populates="collection"
     )
+    terms = db.relationship(
+        "CollectionTermModel",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        back_populates="collection"
+    )
 
     def __repr__(self):
         return f"<CollectionModel {self.id}: {self.name}>"
 
     def __str__(self):
         return self.name
+
+
+class CollectionTermModel(db.Model):
+    __tablename__ = "collection_terms"
+
+    collection_id = db.Column(
+        db.Integer,
+        db.ForeignKey("collections.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False
+    )
+    term = db.Column(db.Text, primary_key=True, nullable=False)
+    document_frequency = db.Column(db.Integer, nullable=False)
+
+    collection = db.relationship("CollectionModel", back_populates="terms")
+
+    def __repr__(self):
+        return (f"<CollectionTermModel ({self.collection_id}, {self.term}): "
+                f"document_frequency={self.document_frequency}>")
@@ -1,43 +1,76 @@
+from collections.abc import Callable, Iterable, Iterator
+
 from sqlalchemy import Row
 
 from app.extensions import cache
-from app.collections.models import CollectionModel
+from app.collections.models import CollectionModel, CollectionTermModel
 from app.database import db
 from app.documents.models import DocumentModel
 from app.documents.selectors import (
-    get_documents_in_collection, get_document_tf_cached
+    iter_documents_terms_in_collection, count_documents_in_collection,
+    get_document_tf_cached
 )
+from app.shared.cache_fill import get_or_compute
 from app.shared.common_models import DocumentCollectionModel
-from app.shared.tfidf_stats import calculate_idf, get_document_tf
-
-from app.users.models import UserModel
-from app.users.services import get_user_by_username
+from app.shared.generations import get_collection_matrix_key
+from app.shared.term_matrix import TermMatrix
+from app.shared.tfidf_stats import calculate_idf
 
 
-def get_collection_by_id(collection_id: int) -> CollectionModel | None:
+def get_user_collection(
+    user_id: int, collection_id: int
+) -> CollectionModel | None:
     return (
         db.session.query(CollectionModel)
-        .filter_by(id=collection_id)
+        .filter_by(id=collection_id, user_id=user_id)
         .first()
     )
 
 
-def get_user_collection(username: str, collection_id: int) -> UserModel | None:
-    user = get_user_by_username(username)
-    return (
-        db.session.query(CollectionModel)
-        .filter_by(id=collection_id, user_id=user.id)
-        .first()
+def get_collections_page(
+    user_id: int, after: int | None, limit: int
+) -> list[dict[str, int | list[dict[str, int | str]]]]:
+    query = (
+        db.session.query(CollectionModel.id)
+        .filter(CollectionModel.user_id == user_id)
     )
 
+    if after is not None:
+        query = query.filter(CollectionModel.id > after)
 
-def get_collections_list(username: str) -> list[CollectionModel]:
-    user = get_user_by_username(username)
-    return (
-        db.session.query(CollectionModel)
-        .filter(CollectionModel.user_id == user.id)
+    collection_ids = [
+        collection.id
+        for collection in query.order_by(CollectionModel.id).limit(limit)
+    ]
+
+    if not collection_ids:
+        return []
+
+    # one query for the documents of the whole page, selecting only the
+    # columns the listing shows
+    documents = (
+        db.session.query(
+            DocumentCollectionModel.collection_id,
+            DocumentModel.id,
+            DocumentModel.name
+        )
+        .join(DocumentModel,
+              DocumentModel.id == DocumentCollectionModel.document_id)
+        .filter(DocumentCollectionModel.collection_id.in_(collection_ids))
+        .order_by(DocumentCollectionModel.collection_id, DocumentModel.id)
         .all()
     )
+    collections = {collection_id: [] for collection_id in collection_ids}
+
+    for collection_id, document_id, document_name in documents:
+        collections[collection_id].append(
+            {"document_id": document_id, "document_name": document_name}
+        )
+
+    return [
+        {"collection_id": collection_id, "documents": documents}
+        for collection_id, documents in collections.items()
+    ]
 
 
 def get_documents_by_collection_id(collection_id: int) -> list[Row]:
@@ -48,65 +81,181 @@ def get_documents_by_collection_id(collection_id: int) -> list[Row]:
     )
 
 
+def get_documents_page_by_collection_id(
+    collection_id: int, after: int | None, limit: int
+) -> list[int]:
+    query = (
+        db.session.query(DocumentCollectionModel.document_id)
+        .filter(DocumentCollectionModel.collection_id == collection_id)
+    )
+
+    if after is not None:
+        query = query.filter(DocumentCollectionModel.document_id > after)
+
+    documents = (
+        query.order_by(DocumentCollectionModel.document_id).limit(limit).all()
+    )
+
+    return [document.document_id for document in documents]
+
+
+def get_collection_documents_stats(
+    collection_id: int, document_ids: list[int]
+) -> tuple[int, list[dict[str, int | dict[str, float]]]]:
+    number_of_documents = count_documents_in_collection(collection_id)
+    documents_tf = {
+        document_id: get_document_tf_cached(document_id)
+        for document_id in document_ids
+    }
+
+    if number_of_documents < 2:
+        return number_of_documents, [
+            {"document_id": document_id, "tf": tf}
+            for document_id, tf in documents_tf.items()
+        ]
+
+    words = {word for tf in documents_tf.values() for word in tf}
+    idf = get_collections_idf(
+        {collection_id: number_of_documents}, list(words)
+    )[collection_id]
+
+    return number_of_documents, [
+        {
+            "document_id": document_id,
+            "tf": tf,
+            "idf": {word: idf[word] for word in tf},
+            "tf_idf": {word: value * idf[word] for word, value in tf.items()}
+        }
+        for document_id, tf in documents_tf.items()
+    ]
+
+
+def get_collection_stats_response(
+    collection_id: int,
+    report_progress: Callable[[int, int], None] | None = None
+) -> dict[str, int | dict[str, float] | str]:
+    number_of_documents, tf, idf = get_collection_stats(
+        collection_id, report_progress
+    )
+    response = {"collection_id": collection_id}
+
+    if number_of_documents == 0:
+        response["message"] = "No documents in collection were found"
+    elif number_of_documents == 1:
+        response["tf"] = tf
+        response["message"] = ("There is only one document in this "
+                               "collection, IDF is unavailable")
+    else:
+        response["tf"] = tf
+        response["idf"] = idf
+
+    return response
+
+
 def get_collection_stats(
-    collection_id: int
+    collection_id: int,
+    report_progress: Callable[[int, int], None] | None = None
 ) -> tuple[int, dict[str, float], dict[str, float]]:
-    documents_in_collection = get_documents_in_collection(collection_id)
-    number_of_documents = len(documents_in_collection)
+    term_matrix = get_collection_term_matrix_cached(
+        collection_id, report_progress
+    )
+    number_of_documents = term_matrix.number_of_documents
 
     if number_of_documents == 0:
         return 0, {}, {}
 
-    if number_of_documents == 1:
-        document_id = documents_in_collection[0][0]
-        tf = get_document_tf_cached(document_id)
+    tf = term_matrix.get_least_frequent_tf()
 
+    if number_of_documents == 1:
         return 1, tf, {}
 
-    tf = get_collection_tf_cached(collection_id)
-    idf = get_collection_idf_cached(collection_id, list(tf.keys()))
+    idf = term_matrix.get_idf(list(tf.keys()))
 
     return number_of_documents, tf, idf
 
 
-def get_collection_tf_cached(collection_id: int) -> dict[str, float]:
-    cache_key = f"collection_tf:{collection_id}"
-    cached_tf = cache.get(cache_key)
+def is_collection_term_matrix_cached(collection_id: int) -> bool:
+    return cache.has(get_collection_matrix_key(collection_id))
 
-    if cached_tf is not None:
-        return cached_tf
 
-    all_text = get_collection_documents_text(collection_id)
-    tf = get_document_tf(all_text)
-    cache.set(cache_key, tf, timeout=6 * 3600)
+def get_collection_term_matrix_cached(
+    collection_id: int,
+    report_progress: Callable[[int, int], None] | None = None
+) -> TermMatrix:
+    def build_term_matrix() -> TermMatrix:
+        documents_terms = iter_documents_terms_in_collection(collection_id)
 
-    return tf
+        if report_progress is not None:
+            documents_terms = iter_with_progress(
+                documents_terms,
+                count_documents_in_collection(collection_id),
+                report_progress
+            )
 
+        return TermMatrix.from_documents_terms(documents_terms)
 
-def get_collection_idf_cached(
-    collection_id: int, words: list[str]
-) -> dict[str, float]:
-    cache_key = f"collection_idf:{collection_id}"
-    cached_idf = cache.get(cache_key)
+    return get_or_compute(
+        get_collection_matrix_key(collection_id),
+        build_term_matrix,
+        timeout=3 * 24 * 3600,
+        dump=TermMatrix.to_bytes,
+        load=TermMatrix.from_bytes
+    )
 
-    if cached_idf is not None:
-        return {word: cached_idf.get(word, 0.0) for word in words}
 
-    documents_in_collection = get_documents_in_collection(collection_id)
-    idf_dict = calculate_idf(documents_in_collection)
+def iter_with_progress(
+    documents_terms: Iterable[Row],
+    total: int,
+    report_progress: Callable[[int, int], None],
+    every: int = 100
+) -> Iterator[Row]:
+    done = 0
 
-    cache.set(cache_key, idf_dict, timeout=6 * 3600)
+    for document_terms in documents_terms:
+        yield document_terms
+        done += 1
 
-    return {word: idf_dict.get(word, 0.0) for word in words}
+        if done % every == 0:
+            report_progress(done, total)
 
 
-def get_collection_documents_text(collection_id: int) -> str:
-    documents = (
-        db.session.query(DocumentModel.contents)
-        .join(DocumentCollectionModel,
-              DocumentModel.id == DocumentCollectionModel.document_id)
-        .filter(DocumentCollectionModel.collection_id == collection_id)
+def get_collections_idf(
+    documents_counts: dict[int, int], words: list[str]
+) -> dict[int, dict[str, float]]:
+    document_frequencies = get_document_frequencies(
+        list(documents_counts), words
+    )
+    collections_idf = {}
+
+    for collection_id, number_of_documents in documents_counts.items():
+        idf = calculate_idf(
+            document_frequencies.get(collection_id, {}), number_of_documents
+        )
+        collections_idf[collection_id] = {
+            word: idf.get(word, 0.0) for word in words
+        }
+
+    return collections_idf
+
+
+def get_document_frequencies(
+    collection_ids: list[int], words: list[str]
+) -> dict[int, dict[str, int]]:
+    document_frequencies = (
+        db.session.query(
+            CollectionTermModel.collection_id,
+            CollectionTermModel.term,
+            CollectionTermModel.document_frequency
+        )
+        .filter(
+            CollectionTermModel.collection_id.in_(collection_ids),
+            CollectionTermModel.term.in_(words)
+        )
         .all()
     )
+    collections_frequencies = {}
+
+    for collection_id, term, df in document_frequencies:
+        collections_frequencies.setdefault(collection_id, {})[term] = df
 
-    return " ".join(document.contents for document in documents)
+    return collections_frequencies
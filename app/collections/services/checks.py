@@ -1,38 +1,59 @@
-from app.users.models import UserModel
-from app.database import db
-from app.collections.models import CollectionModel
-from app.documents.services.checks import is_user_document_present
-from app.shared.common_models import DocumentCollectionModel
+from typing import NamedTuple
 
+from sqlalchemy import select
 
-def user_collection_exists(user: UserModel, collection_id: int) -> bool:
-    return (
-        db.session.query(CollectionModel)
-        .filter_by(id=collection_id, user_id=user.id)
-        .first()
-    ) is not None
+from app.collections.models import CollectionModel
+from app.database import db
+from app.documents.models import DocumentModel
+from app.shared.common_models import DocumentCollectionModel
+from app.shared.existence import exists_where, row_exists
 
 
-def user_collection_with_name_exists(
-    user: UserModel, collection_name: str
-) -> bool:
-    return (
-        db.session.query(CollectionModel)
-        .filter_by(name=collection_name, user_id=user.id)
-        .first()
-    ) is not None
+class CollectionDocumentAccess(NamedTuple):
+    collection_id: int
+    document_id: int
+    owns_collection: bool
+    owns_document: bool
+    linked: bool
 
 
-def user_document_exists(user: UserModel, document_id: int) -> bool:
-    return is_user_document_present(document_id, user)
+def user_collection_exists(user_id: int, collection_id: int) -> bool:
+    return row_exists(
+        CollectionModel.id == collection_id,
+        CollectionModel.user_id == user_id
+    )
 
 
-def document_in_collection_exists(
-    collection_id: int, document_id: int
+def user_collection_with_name_exists(
+    user_id: int, collection_name: str
 ) -> bool:
-    return (
-        db.session.query(DocumentCollectionModel)
-        .filter_by(collection_id=collection_id, document_id=document_id)
-        .first()
-    ) is not None
-
+    return row_exists(
+        CollectionModel.name == collection_name,
+        CollectionModel.user_id == user_id
+    )
+
+
+def get_collection_document_access(
+    user_id: int, collection_id: int, document_id: int
+) -> CollectionDocumentAccess:
+    # collection ownership, document ownership and the link between them
+    # are resolved in one statement instead of a query per check
+    owns_collection, owns_document, linked = db.session.execute(select(
+        exists_where(
+            CollectionModel.id == collection_id,
+            CollectionModel.user_id == user_id
+        ),
+        exists_where(
+            DocumentModel.id == document_id,
+            DocumentModel.user_id == user_id
+        ),
+        exists_where(
+            DocumentCollectionModel.collection_id == collection_id,
+            DocumentCollectionModel.document_id == document_id
+        )
+    )).one()
+
+    return CollectionDocumentAccess(
+        collection_id, document_id,
+        bool(owns_collection), bool(owns_document), bool(linked)
+    )
@@ -1,15 +1,16 @@
-from app.extensions import cache
 from app.collections.models import CollectionModel
-from app.collections.selectors import get_collection_by_id, get_user_collection
+from app.collections.selectors import get_user_collection
+from app.collections.services.checks import CollectionDocumentAccess
+from app.collections.services.terms import (
+    add_document_to_terms_index, remove_document_from_terms_index
+)
 from app.database import db
-from app.documents.selectors import get_document_by_id
 from app.shared.common_models import DocumentCollectionModel
-from app.users.services import get_user_by_username
+from app.shared.generations import bump_generations
 
 
-def add_collection(username: str, collection_name: str) -> CollectionModel:
-    user = get_user_by_username(username)
-    collection = CollectionModel(name=collection_name, user_id=user.id)
+def add_collection(user_id: int, collection_name: str) -> CollectionModel:
+    collection = CollectionModel(name=collection_name, user_id=user_id)
 
     db.session.add(collection)
     db.session.commit()
@@ -18,29 +19,23 @@ def add_collection(username: str, collection_name: str) -> CollectionModel:
 
 
 def add_document_to_collection(
-    collection_id: int, document_id: int
-) -> DocumentCollectionModel | None:
-    collection = get_collection_by_id(collection_id)
-    document = get_document_by_id(document_id)
-
-    if not collection or not document:
-        return None
-
+    access: CollectionDocumentAccess
+) -> DocumentCollectionModel:
     link = DocumentCollectionModel(
-        collection_id=collection_id, document_id=document_id
+        collection_id=access.collection_id, document_id=access.document_id
     )
     db.session.add(link)
+    add_document_to_terms_index(access.collection_id, access.document_id)
     db.session.commit()
-    cache.delete(f"collection_tf:{collection_id}")
-    cache.delete(f"collection_idf:{collection_id}")
+    bump_generations(collection_ids=[access.collection_id])
 
     return link
 
 
 def update_collection_name(
-    username: str, collection_id: int, collection_name: str
+    user_id: int, collection_id: int, collection_name: str
 ) -> None | CollectionModel:
-    user_collection = get_user_collection(username, collection_id)
+    user_collection = get_user_collection(user_id, collection_id)
     user_collection.name = collection_name
     db.session.commit()
 
@@ -48,32 +43,38 @@ def update_collection_name(
 
 
 def delete_document_from_collection(
-    collection_id: int, document_id: int
-) -> DocumentCollectionModel | None:
-    link = (
+    access: CollectionDocumentAccess
+) -> bool:
+    # the link is deleted without loading it, the rowcount tells whether
+    # a concurrent request has removed it in the meantime
+    deleted = (
         db.session.query(DocumentCollectionModel)
-        .filter_by(collection_id=collection_id, document_id=document_id)
-        .first()
+        .filter_by(
+            collection_id=access.collection_id,
+            document_id=access.document_id
+        )
+        .delete()
     )
 
-    if not link:
-        return None
+    if not deleted:
+        db.session.rollback()
+        return False
 
-    db.session.delete(link)
+    remove_document_from_terms_index(
+        access.collection_id, access.document_id
+    )
     db.session.commit()
-    cache.delete(f"collection_tf:{collection_id}")
-    cache.delete(f"collection_idf:{collection_id}")
+    bump_generations(collection_ids=[access.collection_id])
 
-    return link
+    return True
 
 
 def remove_collection(
-    username: str, collection_id: int
+    user_id: int, collection_id: int
 ) -> CollectionModel | None:
-    collection = get_user_collection(username, collection_id)
+    collection = get_user_collection(user_id, collection_id)
     db.session.delete(collection)
     db.session.commit()
-    cache.delete(f"collection_tf:{collection_id}")
-    cache.delete(f"collection_idf:{collection_id}")
+    bump_generations(collection_ids=[collection_id])
 
     return collection
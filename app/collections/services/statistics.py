@@ -0,0 +1,37 @@
+from typing import Any
+
+from app.collections.selectors import get_collection_stats_response
+from app.extensions import cache
+from app.jobs.services import (
+    ACTIVE_STATUSES, JOB_TIMEOUT, get_job, is_job_alive, submit_job
+)
+from app.shared.generations import get_collection_generation
+
+
+def start_collection_stats_job(
+    username: str, collection_id: int
+) -> dict[str, Any]:
+    generation = get_collection_generation(collection_id)
+    job_key = f"collection_stats_job:{collection_id}:{generation}"
+    running_job = get_running_job(cache.get(job_key))
+
+    if running_job is not None:
+        return running_job
+
+    job = submit_job(username, get_collection_stats_response, collection_id)
+    cache.set(job_key, job["job_id"], timeout=JOB_TIMEOUT)
+
+    return job
+
+
+def get_running_job(job_id: str | None) -> dict[str, Any] | None:
+    job = get_job(job_id) if job_id else None
+
+    if (
+        job is None
+        or job["status"] not in ACTIVE_STATUSES
+        or not is_job_alive(job)
+    ):
+        return None
+
+    return job
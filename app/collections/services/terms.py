@@ -0,0 +1,92 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.collections.models import CollectionTermModel
+from app.database import db
+from app.documents.selectors import get_document_term_counts
+
+TERMS_BATCH_SIZE = 1000
+
+
+def add_document_to_terms_index(collection_id: int, document_id: int) -> None:
+    term_counts, _ = get_document_term_counts(document_id)
+    increment_document_frequencies(
+        collection_id, dict.fromkeys(term_counts, 1)
+    )
+
+
+def add_documents_to_terms_index(
+    collection_id: int, documents_terms: Iterable[Iterable[str]]
+) -> None:
+    document_frequencies = Counter()
+    # every document adds one to a term however often it repeats it there
+    for terms in documents_terms:
+        document_frequencies.update(set(terms))
+
+    increment_document_frequencies(collection_id, document_frequencies)
+
+
+def increment_document_frequencies(
+    collection_id: int, document_frequencies: dict[str, int]
+) -> None:
+    # rows are locked in the order they are upserted, sorting the terms
+    # makes concurrent writers to a collection lock them in the same order
+    for terms in split_into_batches(sorted(document_frequencies)):
+        statement = insert(CollectionTermModel).values([
+            {
+                "collection_id": collection_id,
+                "term": term,
+                "document_frequency": document_frequencies[term]
+            }
+            for term in terms
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                CollectionTermModel.collection_id, CollectionTermModel.term
+            ],
+            set_={
+                "document_frequency":
+                    CollectionTermModel.document_frequency
+                    + statement.excluded.document_frequency
+            }
+        )
+        db.session.execute(statement)
+
+
+def remove_document_from_terms_index(
+    collection_id: int, document_id: int
+) -> None:
+    term_counts, _ = get_document_term_counts(document_id)
+    remove_terms_from_index([collection_id], term_counts)
+
+
+def remove_terms_from_index(
+    collection_ids: list[int], terms: Iterable[str]
+) -> None:
+    for terms_batch in split_into_batches(sorted(terms)):
+        document_terms = (
+            db.session.query(CollectionTermModel)
+            .filter(
+                CollectionTermModel.collection_id.in_(collection_ids),
+                CollectionTermModel.term.in_(terms_batch)
+            )
+        )
+        document_terms.update(
+            {
+                CollectionTermModel.document_frequency:
+                    CollectionTermModel.document_frequency - 1
+            },
+            synchronize_session=False
+        )
+        document_terms.filter(
+            CollectionTermModel.document_frequency <= 0
+        ).delete(synchronize_session=False)
+
+
+def split_into_batches(terms: list[str]) -> list[list[str]]:
+    return [
+        terms[i:i + TERMS_BATCH_SIZE]
+        for i in range(0, len(terms), TERMS_BATCH_SIZE)
+    ]
@@ -26,8 +26,25 @@ jwt_refresh_token_expires_days = int(os.getenv(
     "JWT_REFRESH_TOKEN_EXPIRES_DAYS"
 ))
 
+tokenizer_pool_size = int(os.getenv("TOKENIZER_POOL_SIZE") or 2)
+tokenizer_inline_max_chars = int(
+    os.getenv("TOKENIZER_INLINE_MAX_CHARS") or 256 * 1024
+)
+statistics_jobs_pool_size = int(
+    os.getenv("STATISTICS_JOBS_POOL_SIZE") or 2
+)
+huffman_precompute = str_to_bool(os.getenv("HUFFMAN_PRECOMPUTE"))
+bulk_upload_max_bytes = int(
+    os.getenv("BULK_UPLOAD_MAX_BYTES") or 50 * 1024 * 1024
+)
+bulk_upload_max_files = int(os.getenv("BULK_UPLOAD_MAX_FILES") or 100)
+
 redis_host = os.getenv("CACHE_REDIS_HOST")
 redis_port = os.getenv("CACHE_REDIS_PORT")
+local_cache_max_bytes = int(
+    os.getenv("LOCAL_CACHE_MAX_BYTES") or 64 * 1024 * 1024
+)
+cache_compression = os.getenv("CACHE_COMPRESSION") or "zlib"
 
 postgres_user = os.getenv("POSTGRES_USER")
 postgres_password = os.getenv("POSTGRES_PASSWORD")
@@ -63,6 +80,14 @@ class Config:
     CACHE_REDIS_HOST = redis_host
     CACHE_REDIS_PORT = redis_port
     CACHE_KEY_PREFIX = ""
+    LOCAL_CACHE_MAX_BYTES = local_cache_max_bytes
+    CACHE_COMPRESSION = cache_compression
+    TOKENIZER_POOL_SIZE = tokenizer_pool_size
+    TOKENIZER_INLINE_MAX_CHARS = tokenizer_inline_max_chars
+    STATISTICS_JOBS_POOL_SIZE = statistics_jobs_pool_size
+    HUFFMAN_PRECOMPUTE = huffman_precompute
+    BULK_UPLOAD_MAX_BYTES = bulk_upload_max_bytes
+    BULK_UPLOAD_MAX_FILES = bulk_upload_max_files
 
 
 class DevelopmentConfig(Config):
@@ -73,4 +98,16 @@ class ProductionConfig(Config):
     PROPAGATE_EXCEPTIONS = True
 
 
-config_by_name = {"dev": DevelopmentConfig, "prod": ProductionConfig}
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    CACHE_TYPE = "SimpleCache"
+    TOKENIZER_POOL_SIZE = 0
+    HUFFMAN_PRECOMPUTE = False
+
+
+config_by_name = {
+    "dev": DevelopmentConfig,
+    "prod": ProductionConfig,
+    "test": TestingConfig
+}
@@ -4,7 +4,8 @@ from app.documents.namespace import api
 
 document_model = api.model("Document", {
     "document_id": fields.Integer,
-    "document_name": fields.String
+    "document_name": fields.String,
+    "created_at": fields.DateTime
 })
 
 document_content_model = api.model("DocumentContent", {
@@ -12,14 +13,78 @@ document_content_model = api.model("DocumentContent", {
     "document_contents": fields.String
 })
 
-huffman_encoded_document_content_model = api.model(
-    "HuffmanEncodedDocumentContent",
+huffman_packed_document_content_model = api.model(
+    "HuffmanPackedDocumentContent",
     {
         "document_id": fields.Integer,
-        "huffman_encoded_document_contents": fields.String
+        "encoded_contents": fields.String(
+            description="Base64 of the packed bits, the last byte is "
+                        "padded with zeros"
+        ),
+        "bit_length": fields.Integer(
+            description="Number of meaningful bits in encoded_contents"
+        ),
+        "code_lengths": fields.Raw(
+            description="Mapping of every character to the length of its "
+                        "canonical code"
+        )
     }
 )
 
+huffman_mode_stats_model = api.model("HuffmanModeStatistics", {
+    "symbols": fields.Integer(description="Number of coded symbols"),
+    "alphabet_size": fields.Integer(description="Number of distinct symbols"),
+    "encoded_size": fields.Integer(description="Packed bits in bytes"),
+    "code_table_size": fields.Integer(
+        description="Code lengths as UTF-8 JSON in bytes"
+    ),
+    "compressed_size": fields.Integer(
+        description="Size of the binary format in bytes"
+    ),
+    "average_code_length": fields.Float(description="Bits per symbol"),
+    "entropy": fields.Float(description="Shannon entropy, bits per symbol")
+})
+
+huffman_stats_model = api.model("HuffmanStatistics", {
+    "document_id": fields.Integer,
+    "modes": fields.Raw(
+        description="Statistics of the char and word modes, see "
+                    "HuffmanModeStatistics"
+    ),
+    "recommended_mode": fields.String(
+        description="Mode with the smallest compressed size"
+    )
+})
+
+huffman_decode_request_model = api.model("HuffmanDecodeRequest", {
+    "encoded_contents": fields.String(required=True),
+    "bit_length": fields.Integer(required=True, min=0),
+    "code_lengths": fields.Raw(required=True)
+})
+
+huffman_decoded_content_model = api.model("HuffmanDecodedContent", {
+    "decoded_contents": fields.String
+})
+
+bulk_upload_result_model = api.model("BulkUploadResult", {
+    "file_name": fields.String(
+        description="Name of the uploaded file or of the archive member"
+    ),
+    "status": fields.String(
+        description="uploaded, duplicate, rejected, invalid or skipped"
+    ),
+    "document_id": fields.Integer(
+        description="Identifier of the created document, null unless "
+                    "uploaded"
+    ),
+    "message": fields.String(description="Why the file was not uploaded")
+})
+
+bulk_upload_response_model = api.model("BulkUploadResponse", {
+    "uploaded": fields.Integer(description="Number of created documents"),
+    "results": fields.List(fields.Nested(bulk_upload_result_model))
+})
+
 statistics_model = api.model("DocumentStatistics", {
     "document_id": fields.Integer(required=True),
     "tf": fields.Raw(required=False),
@@ -1,21 +1,35 @@
-from flask import request
+import base64
+import binascii
+
+from flask import Response, current_app, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Resource
+from flask_restx import Resource, inputs
+from werkzeug.datastructures import FileStorage
 
 from app.documents.api_models import (
     document_model, message_model, document_content_model, statistics_model,
-    huffman_encoded_document_content_model
+    huffman_packed_document_content_model, huffman_decode_request_model,
+    huffman_decoded_content_model, huffman_stats_model,
+    bulk_upload_response_model
 )
+from app.collections.services.checks import user_collection_exists
 from app.documents.decorators import ensure_user_document_exists
 from app.documents.error_handlers import register_documents_errors_handlers
 from app.documents.namespace import api
 from app.documents.selectors import (
-    get_documents_by_username, fetch_document_contents,
-    get_collections_idf_data, get_document_tf_cached
+    get_documents_page, count_user_documents, fetch_document_contents,
+    get_collections_idf_data, get_document_tf_cached,
+    get_document_huffman_encoding_cached, get_document_huffman_stats_cached
 )
+from app.documents.services.bulk import handle_bulk_upload
 from app.documents.services.crud import remove_document, handle_document_upload
-from app.documents.services.huffman import encode
+from app.documents.services.huffman import (
+    MODES, HuffmanEncoding, serialize_encoding, deserialize_encoding,
+    decode_packed, unpack_bits
+)
 from app.shared.file_utils import is_file_invalid
+from app.shared.pagination import encode_cursor, decode_cursor, utc_datetime
+from app.users.services import current_user_id
 
 register_documents_errors_handlers(api)
 
@@ -28,6 +42,85 @@ upload_parser.add_argument(
     help='A .txt file to upload (max size is 3 MB)'
 )
 
+bulk_upload_parser = api.parser()
+bulk_upload_parser.add_argument(
+    "files",
+    location="files",
+    type=FileStorage,
+    action="append",
+    required=True,
+    help=".txt files or .zip/.tar.gz archives of them, every document "
+         "is limited to 3 MB"
+)
+bulk_upload_parser.add_argument(
+    "collection_id",
+    type=int,
+    location="form",
+    help="Collection to add all uploaded documents to"
+)
+
+documents_parser = api.parser()
+documents_parser.add_argument(
+    "after",
+    type=decode_cursor,
+    location="args",
+    help="Cursor from the `X-Next-After` header of the previous page"
+)
+documents_parser.add_argument(
+    "limit",
+    type=inputs.int_range(1, 100),
+    default=20,
+    location="args",
+    help="Maximum number of documents to return (1-100)"
+)
+documents_parser.add_argument(
+    "name_prefix",
+    type=str,
+    location="args",
+    help="Return only documents whose name starts with this prefix"
+)
+documents_parser.add_argument(
+    "created_from",
+    type=utc_datetime,
+    location="args",
+    help="Return only documents uploaded at or after this ISO 8601 time"
+)
+documents_parser.add_argument(
+    "created_to",
+    type=utc_datetime,
+    location="args",
+    help="Return only documents uploaded before this ISO 8601 time"
+)
+documents_parser.add_argument(
+    "total",
+    type=inputs.boolean,
+    default=True,
+    location="args",
+    help="Count matching documents into the `X-Total-Count` header, "
+         "pass false to skip the count"
+)
+
+huffman_parser = api.parser()
+huffman_parser.add_argument(
+    "format",
+    type=str,
+    choices=("base64", "binary", "legacy"),
+    default="base64",
+    location="args",
+    help="base64 - packed bits as base64 in JSON, binary - "
+         "application/octet-stream with the code table, "
+         "legacy - string of '0' and '1' characters"
+)
+huffman_parser.add_argument(
+    "mode",
+    type=str,
+    choices=MODES,
+    default="char",
+    location="args",
+    help="char - code every character, word - code tokens of the TF "
+         "tokenizer and the separators between them"
+)
+
 
 class SecuredResource(Resource):
     method_decorators = [jwt_required()]
@@ -35,26 +128,49 @@ class SecuredResource(Resource):
 
 @api.route("")
 class DocumentsListResource(SecuredResource):
+    @api.expect(documents_parser)
     @api.doc(
-        description="Get all documents for the current user",
+        description="Get documents for the current user ordered by upload "
+                    "time, paginated with a cursor. When there may be more "
+                    "documents, the `X-Next-After` header holds the value "
+                    "to pass as `after` to get the next page",
         security="BearerAuth",
         responses={
             200: ("Documents were fetched", [document_model]),
+            400: ("Invalid pagination or filter arguments", message_model),
             401: ("Missing JWT in headers or cookie", message_model),
         }
     )
     def get(self):
         """List documents for the current user"""
-        username = get_jwt_identity()
-        documents = get_documents_by_username(username)
+        args = documents_parser.parse_args()
+        user_id = current_user_id()
+        filters = {
+            "name_prefix": args["name_prefix"],
+            "created_from": args["created_from"],
+            "created_to": args["created_to"]
+        }
+        documents = get_documents_page(
+            user_id, args["after"], args["limit"], **filters
+        )
+        headers = {}
 
-        if not documents:
-            return [], 200
+        if args["total"]:
+            total = count_user_documents(user_id, **filters)
+            headers["X-Total-Count"] = str(total)
+
+        if len(documents) == args["limit"]:
+            last = documents[-1]
+            headers["X-Next-After"] = encode_cursor(last.created_at, last.id)
 
         return [
-            {"document_id": doc.id, "document_name": doc.name}
+            {
+                "document_id": doc.id,
+                "document_name": doc.name,
+                "created_at": doc.created_at.isoformat()
+            }
             for doc in documents
-        ], 200
+        ], 200, headers
 
     @api.expect(upload_parser)
     @api.doc(
@@ -80,13 +196,61 @@ class DocumentsListResource(SecuredResource):
             return {"message": "Only .txt files are allowed"}, 400
 
         username = get_jwt_identity()
-        document = handle_document_upload(file, username)
+        document = handle_document_upload(file, current_user_id(), username)
 
         return {
             "message": f"Document with id = {document.id} was uploaded"
         }, 201
 
 
+@api.route("/bulk")
+class DocumentsBulkResource(SecuredResource):
+    @api.expect(bulk_upload_parser)
+    @api.doc(
+        description="Upload many .txt documents at once, as separate files "
+                    "or inside .zip/.tar.gz archives, optionally adding "
+                    "them to a collection. Every file and archive member "
+                    "gets its own result. **Note:** Clients must send the "
+                    "`csrf_access_token` cookie value in the `X-CSRF-TOKEN` "
+                    "header every time they call this endpoint",
+        security="BearerAuth",
+        consumes=["multipart/form-data"],
+        responses={
+            200: ("No document was uploaded", bulk_upload_response_model),
+            201: ("Documents were uploaded", bulk_upload_response_model),
+            400: ("No files were sent", message_model),
+            401: ("Missing JWT in headers or cookie", message_model),
+            404: ("User does not have such collection", message_model),
+            413: ("Upload is too large", message_model)
+        }
+    )
+    def post(self):
+        """Upload many documents"""
+        # archives hold many documents, so the request may be larger than
+        # a single upload, the 3 MB limit still applies to every document
+        request.max_content_length = (
+            current_app.config["BULK_UPLOAD_MAX_BYTES"]
+        )
+        args = bulk_upload_parser.parse_args()
+        user_id = current_user_id()
+        collection_id = args["collection_id"]
+
+        if collection_id is not None and not user_collection_exists(
+            user_id, collection_id
+        ):
+            return {"message": "This user does not have such collection"}, 404
+
+        username = get_jwt_identity()
+        results = handle_bulk_upload(
+            args["files"], user_id, username, collection_id
+        )
+        uploaded = sum(result["status"] == "uploaded" for result in results)
+
+        return {
+            "uploaded": uploaded, "results": results
+        }, 201 if uploaded else 200
+
+
 @api.route("/<int:document_id>")
 @api.param("document_id", "The document identifier")
 class DocumentContentsResource(SecuredResource):
@@ -123,8 +287,8 @@ class DocumentContentsResource(SecuredResource):
     @ensure_user_document_exists
     def delete(self, document_id):
         """Delete a document"""
-        username = get_jwt_identity()
-        remove_document(username, document_id)
+        user_id = current_user_id()
+        remove_document(user_id, document_id)
 
         return {"message": "Document was deleted"}, 200
 
@@ -132,13 +296,17 @@ class DocumentContentsResource(SecuredResource):
 @api.route("/<int:document_id>/huffman")
 @api.param("document_id", "The document identifier")
 class DocumentContentsHuffmanEncodedResource(SecuredResource):
+    @api.expect(huffman_parser)
     @api.doc(
-        description="Fetch document contents and encode "
-                    "into Huffman coding form",
+        description="Fetch document contents and encode into Huffman coding "
+                    "form using canonical codes. The binary format is a "
+                    "big-endian 4-byte code table size and 8-byte bit "
+                    "length, followed by the code lengths as UTF-8 JSON and "
+                    "the packed bits",
         security="BearerAuth",
         responses={
             200: ("Document was encoded",
-                  huffman_encoded_document_content_model),
+                  huffman_packed_document_content_model),
             401: ("Missing JWT in headers or cookie", message_model),
             404: ("User does not have this document", message_model)
         }
@@ -146,15 +314,114 @@ class DocumentContentsHuffmanEncodedResource(SecuredResource):
     @ensure_user_document_exists
     def get(self, document_id):
         """Get document contents in Huffman coding form"""
-        document_data = fetch_document_contents(document_id)
-        encoded_result, _ = encode(document_data)
+        args = huffman_parser.parse_args()
+        encoding = get_document_huffman_encoding_cached(
+            document_id, args["mode"]
+        )
+
+        if args["format"] == "legacy":
+            return {
+                "document_id": document_id,
+                "huffman_encoded_document_contents": unpack_bits(encoding)
+            }, 200
+
+        if args["format"] == "binary":
+            return Response(
+                serialize_encoding(encoding),
+                mimetype="application/octet-stream"
+            )
+
+        return {
+            "document_id": document_id,
+            "encoded_contents": base64.b64encode(
+                encoding.packed
+            ).decode("ascii"),
+            "bit_length": encoding.bit_length,
+            "code_lengths": encoding.code_lengths
+        }, 200
+
+
+@api.route("/<int:document_id>/huffman/statistics")
+@api.param("document_id", "The document identifier")
+class DocumentHuffmanStatisticsResource(SecuredResource):
+    @api.doc(
+        description="Compare Huffman coding of a document in char and word "
+                    "modes by compressed size, average code length and "
+                    "entropy",
+        security="BearerAuth",
+        responses={
+            200: ("Statistics were calculated", huffman_stats_model),
+            401: ("Missing JWT in headers or cookie", message_model),
+            404: ("User does not have this document", message_model)
+        }
+    )
+    @ensure_user_document_exists
+    def get(self, document_id):
+        """Get Huffman coding statistics"""
+        modes_stats = get_document_huffman_stats_cached(document_id)
+        recommended_mode = min(
+            modes_stats, key=lambda mode: modes_stats[mode]["compressed_size"]
+        )
 
         return {
             "document_id": document_id,
-            "huffman_encoded_document_contents": encoded_result
+            "modes": modes_stats,
+            "recommended_mode": recommended_mode
         }, 200
 
 
+@api.route("/huffman/decode")
+class HuffmanDecodeResource(SecuredResource):
+    @api.expect(huffman_decode_request_model)
+    @api.doc(
+        description="Decode canonical Huffman coded contents. Accepts the "
+                    "JSON returned by the Huffman endpoint, or its binary "
+                    "format as application/octet-stream. Contents that "
+                    "would decode to more characters than the upload size "
+                    "limit are rejected",
+        security="BearerAuth",
+        responses={
+            200: ("Contents were decoded", huffman_decoded_content_model),
+            400: ("Encoded contents are invalid", message_model),
+            401: ("Missing JWT in headers or cookie", message_model)
+        }
+    )
+    def post(self):
+        """Decode Huffman coded contents"""
+        if request.mimetype == "application/octet-stream":
+            encoding = deserialize_encoding(request.get_data())
+        else:
+            data = request.get_json(silent=True)
+
+            if not isinstance(data, dict) or not all(
+                field in data
+                for field in ("encoded_contents", "bit_length", "code_lengths")
+            ):
+                return {
+                    "message": "encoded_contents, bit_length and "
+                               "code_lengths are required"
+                }, 400
+
+            try:
+                packed = base64.b64decode(
+                    data["encoded_contents"], validate=True
+                )
+            except (binascii.Error, TypeError):
+                return {
+                    "message": "encoded_contents is not valid base64"
+                }, 400
+
+            encoding = HuffmanEncoding(
+                packed, data["bit_length"], data["code_lengths"]
+            )
+
+        decoded_contents = decode_packed(
+            encoding, max_size=current_app.config["MAX_CONTENT_LENGTH"]
+        )
+
+        return {"decoded_contents": decoded_contents}, 200
+
+
 @api.route("/<int:document_id>/statistics")
 @api.param("document_id", "The document identifier")
 class DocumentStatisticsResource(SecuredResource):
@@ -2,7 +2,9 @@ from flask_jwt_extended.exceptions import (
     NoAuthorizationError, InvalidHeaderError
 )
 
-from app.shared.exceptions import DuplicateDocumentError, EmptyFileError
+from app.shared.exceptions import (
+    DuplicateDocumentError, EmptyFileError, InvalidHuffmanPayloadError
+)
 
 
 def register_documents_errors_handlers(api):
@@ -18,3 +20,7 @@ def register_documents_errors_handlers(api):
     @api.errorhandler(EmptyFileError)
     def handle_empty_document(error):
         return {"message": str(error)}, 400
+
+    @api.errorhandler(InvalidHuffmanPayloadError)
+    def handle_invalid_huffman_payload(error):
+        return {"message": str(error)}, 400
@@ -5,11 +5,19 @@ from app.database import db
 
 class DocumentModel(db.Model):
     __tablename__ = "documents"
+    __table_args__ = (
+        db.Index(
+            "ix_documents_user_id_created_at_id",
+            "user_id", "created_at", "id"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
-    contents = db.Column(db.Text, nullable=False)
+    # contents are up to 3 MB, they are loaded only when accessed
+    contents = db.deferred(db.Column(db.Text, nullable=False))
     content_hash = db.Column(db.String(64), index=True, nullable=False)
+    raw_content_hash = db.Column(db.String(64), nullable=False)
     user_id = db.Column(
         db.Integer,
         db.ForeignKey("users.id", ondelete="CASCADE"),
@@ -24,6 +32,16 @@ class DocumentModel(db.Model):
         uselist=False
     )
 
+    # the term counts are removed by the ON DELETE CASCADE foreign key, so
+    # deleting a document does not load them
+    document_terms = db.relationship(
+        "DocumentTermsModel",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        uselist=False
+    )
+
     collections = db.relationship(
         "DocumentCollectionModel",
         cascade="all, delete-orphan",
@@ -35,3 +53,27 @@ class DocumentModel(db.Model):
 
     def __str__(self):
         return self.name
+
+
+class DocumentTermsModel(db.Model):
+    __tablename__ = "document_terms"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    document_id = db.Column(
+        db.Integer,
+        db.ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    term_counts = db.Column(db.JSON, nullable=False)
+    total_terms = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    document = db.relationship(
+        "DocumentModel", back_populates="document_terms"
+    )
+
+    def __repr__(self):
+        return (f"<DocumentTermsModel {self.id}: "
+                f"document_id={self.document_id}, "
+                f"total_terms={self.total_terms}>")
@@ -1,39 +1,89 @@
-from sqlalchemy import Row
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy import Row, func, tuple_
+from sqlalchemy.orm import Query
 
-from app.extensions import cache
 from app.database import db
-from app.documents.models import DocumentModel
+from app.documents.models import DocumentModel, DocumentTermsModel
+from app.documents.services.huffman import (
+    MODES, HuffmanEncoding, encode_packed, get_encoding_stats,
+    serialize_encoding, deserialize_encoding
+)
+from app.shared.cache_fill import get_or_compute
+from app.shared.codec import decode_term_values, encode_term_values
 from app.shared.common_models import DocumentCollectionModel
+from app.shared.generations import get_document_tf_key
 from app.shared.tfidf_stats import get_document_tf
-from app.users.services import get_user_by_username
 
 
-def get_documents_by_username(username: str) -> list[Row]:
-    user = get_user_by_username(username)
+def filter_user_documents(
+    user_id: int,
+    name_prefix: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> Query:
+    query = (
+        db.session.query(
+            DocumentModel.id, DocumentModel.name, DocumentModel.created_at
+        )
+        .filter(DocumentModel.user_id == user_id)
+    )
+
+    if name_prefix:
+        query = query.filter(
+            DocumentModel.name.startswith(name_prefix, autoescape=True)
+        )
+    if created_from is not None:
+        query = query.filter(DocumentModel.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(DocumentModel.created_at < created_to)
+
+    return query
+
+
+def get_documents_page(
+    user_id: int,
+    after: tuple[datetime, int] | None,
+    limit: int,
+    **filters: str | datetime | None
+) -> list[Row]:
+    query = filter_user_documents(user_id, **filters)
+
+    # the (user_id, created_at, id) index serves both the row comparison
+    # and the ordering, so a page never scans the documents before it
+    if after is not None:
+        query = query.filter(
+            tuple_(DocumentModel.created_at, DocumentModel.id) > after
+        )
 
     return (
-        db.session.query(DocumentModel.id, DocumentModel.name)
-        .filter(DocumentModel.user_id == user.id)
+        query.order_by(DocumentModel.created_at, DocumentModel.id)
+        .limit(limit)
         .all()
     )
 
 
-def get_user_document(username: str, document_id: int):
-    user = get_user_by_username(username)
+def count_user_documents(
+    user_id: int, **filters: str | datetime | None
+) -> int:
+    return (
+        filter_user_documents(user_id, **filters)
+        .with_entities(func.count(DocumentModel.id))
+        .scalar()
+    )
+
 
+def get_user_document(user_id: int, document_id: int):
     return (
         db.session.query(DocumentModel)
         .filter(
-            DocumentModel.id == document_id, DocumentModel.user_id == user.id
+            DocumentModel.id == document_id, DocumentModel.user_id == user_id
         )
         .first()
     )
 
 
-def get_document_by_id(document_id: int) -> DocumentModel | None:
-    return db.session.query(DocumentModel).filter_by(id=document_id).first()
-
-
 def fetch_document_contents(document_id: int) -> str | None:
     document = (
         db.session.query(DocumentModel.contents)
@@ -44,18 +94,76 @@ def fetch_document_contents(document_id: int) -> str | None:
     return document if document else None
 
 
+def get_document_term_counts(document_id: int) -> tuple[dict[str, int], int]:
+    document_terms = (
+        db.session.query(
+            DocumentTermsModel.term_counts, DocumentTermsModel.total_terms
+        )
+        .filter(DocumentTermsModel.document_id == document_id)
+        .first()
+    )
+
+    if document_terms is None:
+        return {}, 0
+
+    return document_terms.term_counts, document_terms.total_terms
+
+
 def get_document_tf_cached(document_id: int) -> dict[str, float] | None:
-    cache_key = f"tf:{document_id}"
-    cached_tf = cache.get(cache_key)
+    def compute_tf() -> dict[str, float]:
+        word_counts, total_words = get_document_term_counts(document_id)
+        return get_document_tf(word_counts, total_words)
+
+    return get_or_compute(
+        get_document_tf_key(document_id),
+        compute_tf,
+        timeout=7 * 24 * 3600,
+        dump=encode_term_values,
+        load=decode_term_values
+    )
+
 
-    if cached_tf is not None:
-        return cached_tf
+def get_document_raw_content_hash(document_id: int) -> str | None:
+    return (
+        db.session.query(DocumentModel.raw_content_hash)
+        .filter(DocumentModel.id == document_id)
+        .scalar()
+    )
 
-    document_contents = fetch_document_contents(document_id)
-    tf = get_document_tf(document_contents)
-    cache.set(cache_key, tf, timeout=6 * 3600)
 
-    return tf
+def get_document_huffman_encoding_cached(
+    document_id: int, mode: str = "char"
+) -> HuffmanEncoding:
+    # keyed by contents rather than by document, so identical uploads of
+    # different users share one entry and it never needs invalidation
+    raw_content_hash = get_document_raw_content_hash(document_id)
+
+    def compute_encoding() -> HuffmanEncoding:
+        return encode_packed(fetch_document_contents(document_id), mode)
+
+    return get_or_compute(
+        f"huffman:{mode}:{raw_content_hash}",
+        compute_encoding,
+        timeout=7 * 24 * 3600,
+        dump=serialize_encoding,
+        load=deserialize_encoding
+    )
+
+
+def get_document_huffman_stats_cached(
+    document_id: int
+) -> dict[str, dict[str, int | float]]:
+    raw_content_hash = get_document_raw_content_hash(document_id)
+
+    def compute_stats() -> dict[str, dict[str, int | float]]:
+        contents = fetch_document_contents(document_id)
+        return {mode: get_encoding_stats(contents, mode) for mode in MODES}
+
+    return get_or_compute(
+        f"huffman_stats:{raw_content_hash}",
+        compute_stats,
+        timeout=7 * 24 * 3600
+    )
 
 
 def get_collections_idf_data(
@@ -66,19 +174,32 @@ def get_collections_idf_data(
     if not collections:
         return None
 
+    documents_counts = count_documents_in_collections(collections)
+    shared_collections = {
+        collection_id: number_of_documents
+        for collection_id, number_of_documents in documents_counts.items()
+        if number_of_documents > 1
+    }
+    collections_idf = {}
+
+    if shared_collections:
+        from app.collections.selectors import get_collections_idf
+        collections_idf = get_collections_idf(
+            shared_collections, list(tf.keys())
+        )
+
     return [
-        get_collection_idf_data(collection_id, tf)
+        get_collection_idf_data(
+            collection_id, tf, collections_idf.get(collection_id)
+        )
         for collection_id in collections
     ]
 
 
 def get_collection_idf_data(
-    collection_id: int, tf: dict[str, float]
+    collection_id: int, tf: dict[str, float], idf: dict[str, float] | None
 ) -> dict[str, int | dict[str, float] | str]:
-    documents = get_documents_in_collection(collection_id)
-    number_of_documents = len(documents)
-
-    if number_of_documents == 1:
+    if idf is None:
         return {
             "collection_id": collection_id,
             "tf": tf,
@@ -88,9 +209,6 @@ def get_collection_idf_data(
             )
         }
 
-    from app.collections.selectors import get_collection_idf_cached
-    idf = get_collection_idf_cached(collection_id, list(tf.keys()))
-
     return {
         "collection_id": collection_id,
         "tf": tf,
@@ -108,13 +226,44 @@ def get_collections_for_document(document_id: int) -> list[int]:
     return [collection_id.collection_id for collection_id in collection_ids]
 
 
-def get_documents_in_collection(collection_id: int) -> list[tuple[int, str]]:
-    documents = (
-        db.session.query(DocumentModel.id, DocumentModel.contents)
-        .join(DocumentCollectionModel,
-              DocumentModel.id == DocumentCollectionModel.document_id)
+def count_documents_in_collection(collection_id: int) -> int:
+    return (
+        db.session.query(func.count(DocumentCollectionModel.document_id))
         .filter(DocumentCollectionModel.collection_id == collection_id)
+        .scalar()
+    )
+
+
+def count_documents_in_collections(
+    collection_ids: list[int]
+) -> dict[int, int]:
+    documents_counts = (
+        db.session.query(
+            DocumentCollectionModel.collection_id,
+            func.count(DocumentCollectionModel.document_id)
+        )
+        .filter(DocumentCollectionModel.collection_id.in_(collection_ids))
+        .group_by(DocumentCollectionModel.collection_id)
         .all()
     )
 
-    return documents
+    return {
+        collection_id: number_of_documents
+        for collection_id, number_of_documents in documents_counts
+    }
+
+
+def iter_documents_terms_in_collection(
+    collection_id: int, batch_size: int = 100
+) -> Iterator[Row]:
+    yield from (
+        db.session.query(
+            DocumentTermsModel.document_id, DocumentTermsModel.term_counts
+        )
+        .join(DocumentCollectionModel,
+              DocumentTermsModel.document_id
+              == DocumentCollectionModel.document_id)
+        .filter(DocumentCollectionModel.collection_id == collection_id)
+        .order_by(DocumentTermsModel.document_id)
+        .yield_per(batch_size)
+    )
@@ -0,0 +1,207 @@
+import gzip
+import tarfile
+import zipfile
+import zlib
+from collections.abc import Iterator
+from typing import IO
+
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+
+from app.collections.services.terms import add_documents_to_terms_index
+from app.database import db
+from app.documents.models import DocumentModel
+from app.documents.selectors import get_document_huffman_encoding_cached
+from app.documents.services.checks import get_duplicate_hashes
+from app.documents.services.crud import build_document
+from app.jobs.services import submit_task
+from app.shared.common_models import DocumentCollectionModel
+from app.shared.exceptions import DocumentTooLargeError, EmptyFileError
+from app.shared.file_utils import (
+    IngestedFile, ingest_stream, count_ingested_files, store_ingested_file,
+    discard_file, get_user_media_path, is_archive, iter_archive_members
+)
+from app.shared.generations import bump_generations
+
+ARCHIVE_ERRORS = (
+    zipfile.BadZipFile, tarfile.TarError, gzip.BadGzipFile, zlib.error,
+    EOFError
+)
+INVALID_FILE_MESSAGE = (
+    "Only .txt files and .zip or .tar.gz archives of them are allowed"
+)
+INVALID_ARCHIVE_MESSAGE = "Archive is corrupted or truncated"
+INVALID_ENCODING_MESSAGE = "Document is not a UTF-8 text"
+DUPLICATE_MESSAGE = "Document with this content was already uploaded earlier"
+
+
+def handle_bulk_upload(
+    files: list[FileStorage],
+    user_id: int,
+    username: str,
+    collection_id: int | None = None
+) -> list[dict[str, str | int | None]]:
+    user_folder = get_user_media_path(username)
+    results = []
+    ingested_files: dict[int, IngestedFile] = {}
+    document_ids: dict[int, int] = {}
+
+    try:
+        for filename, stream, error in iter_uploaded_texts(files):
+            if error is None:
+                error = ingest_member(
+                    filename, stream, user_folder, len(results),
+                    ingested_files
+                )
+
+            results.append(get_upload_result(filename, *error or ()))
+
+        documents = build_new_documents(ingested_files, user_id, results)
+
+        if documents:
+            saved_ids = save_documents(
+                list(documents.values()),
+                [ingested_files[index] for index in documents],
+                collection_id
+            )
+            document_ids = dict(zip(documents, saved_ids))
+
+        for index, document_id in document_ids.items():
+            store_ingested_file(ingested_files[index], user_folder)
+            results[index]["document_id"] = document_id
+    finally:
+        for ingested_file in ingested_files.values():
+            discard_file(ingested_file.temp_path)
+
+    if document_ids and collection_id is not None:
+        bump_generations(collection_ids=[collection_id])
+
+    if current_app.config["HUFFMAN_PRECOMPUTE"]:
+        for document_id in document_ids.values():
+            submit_task(get_document_huffman_encoding_cached, document_id)
+
+    return results
+
+
+def iter_uploaded_texts(
+    files: list[FileStorage]
+) -> Iterator[tuple[str, IO[bytes] | None, tuple[str, str] | None]]:
+    for file in files:
+        if file.filename.endswith(".txt"):
+            yield file.filename, file.stream, None
+        elif not is_archive(file.filename):
+            yield file.filename, None, ("invalid", INVALID_FILE_MESSAGE)
+        else:
+            try:
+                for name, stream in iter_archive_members(file):
+                    if name.endswith(".txt"):
+                        yield name, stream, None
+                    else:
+                        yield name, None, ("invalid", INVALID_FILE_MESSAGE)
+            except ARCHIVE_ERRORS:
+                yield file.filename, None, ("invalid", INVALID_ARCHIVE_MESSAGE)
+
+
+def ingest_member(
+    filename: str,
+    stream: IO[bytes],
+    folder: str,
+    index: int,
+    ingested_files: dict[int, IngestedFile]
+) -> tuple[str, str] | None:
+    max_files = current_app.config["BULK_UPLOAD_MAX_FILES"]
+
+    if len(ingested_files) >= max_files:
+        return "skipped", f"Only {max_files} documents can be uploaded at once"
+
+    try:
+        ingested_files[index] = ingest_stream(
+            filename, stream, folder,
+            max_size=current_app.config["MAX_CONTENT_LENGTH"]
+        )
+    except (EmptyFileError, DocumentTooLargeError) as error:
+        return "rejected", str(error)
+    except UnicodeDecodeError:
+        return "invalid", INVALID_ENCODING_MESSAGE
+    except ARCHIVE_ERRORS:
+        return "invalid", INVALID_ARCHIVE_MESSAGE
+
+    return None
+
+
+def build_new_documents(
+    ingested_files: dict[int, IngestedFile],
+    user_id: int,
+    results: list[dict[str, str | int | None]]
+) -> dict[int, DocumentModel]:
+    # one query finds the hashes this user already has, the same set then
+    # catches duplicates within the upload itself
+    content_hashes = get_duplicate_hashes(
+        user_id,
+        {ingested_file.content_hash
+         for ingested_file in ingested_files.values()}
+    )
+    new_indexes = []
+
+    for index, ingested_file in ingested_files.items():
+        if ingested_file.content_hash in content_hashes:
+            results[index] = get_upload_result(
+                results[index]["file_name"], "duplicate", DUPLICATE_MESSAGE
+            )
+            continue
+
+        content_hashes.add(ingested_file.content_hash)
+        new_indexes.append(index)
+
+    counted_files = count_ingested_files(
+        [ingested_files[index] for index in new_indexes]
+    )
+    documents = {}
+
+    for index, ingested_file in zip(new_indexes, counted_files):
+        ingested_files[index] = ingested_file
+        documents[index] = build_document(ingested_file, user_id)
+
+    return documents
+
+
+def save_documents(
+    documents: list[DocumentModel],
+    ingested_files: list[IngestedFile],
+    collection_id: int | None
+) -> list[int]:
+    db.session.add_all(documents)
+    # identifiers are read before the commit expires the instances, so
+    # they do not cost a refresh query each
+    db.session.flush()
+    document_ids = [document.id for document in documents]
+
+    if collection_id is not None:
+        db.session.add_all([
+            DocumentCollectionModel(
+                collection_id=collection_id, document_id=document_id
+            )
+            for document_id in document_ids
+        ])
+        add_documents_to_terms_index(
+            collection_id,
+            [
+                ingested_file.word_counts.keys()
+                for ingested_file in ingested_files
+            ]
+        )
+
+    db.session.commit()
+
+    return document_ids
+
+
+def get_upload_result(
+    filename: str, status: str = "uploaded", message: str | None = None
+) -> dict[str, str | int | None]:
+    return {
+        "file_name": filename,
+        "status": status,
+        "document_id": None,
+        "message": message
+    }
@@ -1,7 +1,11 @@
+from collections.abc import Collection
+
+from sqlalchemy import select
+
 from app.database import db
 from app.documents.models import DocumentModel
-from app.users.models import UserModel
 from app.shared.exceptions import DuplicateDocumentError
+from app.shared.existence import row_exists
 
 
 def check_for_duplicates(user_id: int, content_hash: str) -> None:
@@ -11,27 +15,27 @@ def check_for_duplicates(user_id: int, content_hash: str) -> None:
 
 
 def is_duplicate_document(user_id: int, content_hash: str) -> bool:
-    existing_document = (
-        db.session.query(DocumentModel)
-        .filter_by(user_id=user_id, content_hash=content_hash)
-        .first()
+    return row_exists(
+        DocumentModel.user_id == user_id,
+        DocumentModel.content_hash == content_hash
     )
-    return existing_document is not None
-
 
-def is_user_document_present(document_id: int, user: UserModel) -> bool:
-    return (
-        db.session.query(DocumentModel)
-        .filter_by(id=document_id, user_id=user.id)
-        .first()
-    ) is not None
 
+def get_duplicate_hashes(
+    user_id: int, content_hashes: Collection[str]
+) -> set[str]:
+    if not content_hashes:
+        return set()
 
-def user_has_document(user: UserModel, document_id: int) -> bool:
-    return (
-        db.session.query(DocumentModel)
-        .filter(
-            DocumentModel.id == document_id, DocumentModel.user_id == user.id
+    return set(db.session.scalars(
+        select(DocumentModel.content_hash).where(
+            DocumentModel.user_id == user_id,
+            DocumentModel.content_hash.in_(content_hashes)
         )
-        .first()
-    ) is not None
+    ))
+
+
+def user_has_document(user_id: int, document_id: int) -> bool:
+    return row_exists(
+        DocumentModel.id == document_id, DocumentModel.user_id == user_id
+    )
@@ -1,39 +1,48 @@
-import os
-
+from flask import current_app
+from sqlalchemy import delete
 from werkzeug.datastructures import FileStorage
 
-from app.extensions import cache
+from app.collections.services.terms import remove_terms_from_index
 from app.database import db
-from app.documents.models import DocumentModel
-from app.documents.selectors import get_user_document
+from app.documents.models import DocumentModel, DocumentTermsModel
+from app.documents.selectors import (
+    get_user_document, get_document_term_counts,
+    get_document_huffman_encoding_cached
+)
 from app.documents.services.checks import check_for_duplicates
-from app.shared.file_utils import save_uploaded_file, compute_content_hash
-from app.system.services import create_document_metrics
-from app.users.services import get_user_by_username
-
-
-def handle_document_upload(file: FileStorage, username: str) -> DocumentModel:
-    file_path, contents = save_uploaded_file(file, username)
-    user = get_user_by_username(username)
-    content_hash = compute_content_hash(contents.lower())
+from app.jobs.services import submit_task
+from app.shared.common_models import DocumentCollectionModel
+from app.shared.file_utils import (
+    IngestedFile, ingest_uploaded_file, store_ingested_file,
+    read_ingested_file, discard_file, get_user_media_path
+)
+from app.shared.generations import bump_generations
+from app.system.models import DocumentMetricModel
+
+
+def handle_document_upload(
+    file: FileStorage, user_id: int, username: str
+) -> DocumentModel:
+    user_folder = get_user_media_path(username)
+    ingested_file = ingest_uploaded_file(file, user_folder)
 
-    check_for_duplicates(user.id, content_hash)
+    try:
+        check_for_duplicates(user_id, ingested_file.content_hash)
+        document = create_and_store_document(ingested_file, user_id)
+        store_ingested_file(ingested_file, user_folder)
+    finally:
+        discard_file(ingested_file.temp_path)
 
-    document = create_and_store_document(
-        file_path, contents, content_hash, user.id
-    )
-
-    record_document_metrics(document.id, file_path, contents)
+    if current_app.config["HUFFMAN_PRECOMPUTE"]:
+        submit_task(get_document_huffman_encoding_cached, document.id)
 
     return document
 
 
 def create_and_store_document(
-    file_path: str, contents: str, content_hash: str, user_id: int
+    ingested_file: IngestedFile, user_id: int
 ) -> DocumentModel:
-    document = create_document(
-        os.path.basename(file_path), contents, content_hash, user_id
-    )
+    document = build_document(ingested_file, user_id)
 
     db.session.add(document)
     db.session.commit()
@@ -41,31 +50,57 @@ def create_and_store_document(
     return document
 
 
-def record_document_metrics(
-    document_id: int, file_path: str, contents: str
-) -> None:
-    create_document_metrics(
-        document_id,
-        len(contents.split()),
-        os.path.getsize(file_path)
+def build_document(
+    ingested_file: IngestedFile, user_id: int
+) -> DocumentModel:
+    contents = read_ingested_file(ingested_file)
+    document = create_document(
+        ingested_file.filename, contents, ingested_file.content_hash,
+        ingested_file.raw_content_hash, user_id
+    )
+    document.document_terms = DocumentTermsModel(
+        term_counts=dict(ingested_file.word_counts),
+        total_terms=ingested_file.total_words
+    )
+    document.document_metric = DocumentMetricModel(
+        word_count=ingested_file.total_words, size=ingested_file.size
     )
 
+    return document
+
 
-def create_document(name, contents, content_hash, user_id) -> DocumentModel:
+def create_document(
+    name, contents, content_hash, raw_content_hash, user_id
+) -> DocumentModel:
     return DocumentModel(
-        name=name, contents=contents,
-        content_hash=content_hash, user_id=user_id
+        name=name, contents=contents, content_hash=content_hash,
+        raw_content_hash=raw_content_hash, user_id=user_id
     )
 
 
-def remove_document(username: str, document_id: int) -> DocumentModel | None:
-    document = get_user_document(username, document_id)
+def remove_document(user_id: int, document_id: int) -> DocumentModel | None:
+    document = get_user_document(user_id, document_id)
 
     if not document:
         return None
 
+    # the links are deleted first and only the collections they were
+    # actually removed from are decremented, an unlink committed meanwhile
+    # has already done it for its own collection
+    collection_ids = db.session.execute(
+        delete(DocumentCollectionModel)
+        .where(DocumentCollectionModel.document_id == document_id)
+        .returning(DocumentCollectionModel.collection_id)
+    ).scalars().all()
+
+    if collection_ids:
+        term_counts, _ = get_document_term_counts(document_id)
+        remove_terms_from_index(collection_ids, term_counts)
+
     db.session.delete(document)
     db.session.commit()
-    cache.delete(f"tf:{document_id}")
+    bump_generations(
+        collection_ids=collection_ids, document_ids=[document_id]
+    )
 
     return document
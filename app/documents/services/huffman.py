@@ -1,103 +1,407 @@
 from __future__ import annotations
 
 import heapq
+import json
+import math
+import struct
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from typing import NamedTuple
 
+from app.shared.exceptions import InvalidHuffmanPayloadError
+from app.shared.tokenizer import split_with_separators
 
-class HuffmanNode:
-    def __init__(
-        self,
-        frequency: int,
-        data: str | None,
-        left: HuffmanNode | None = None,
-        right: HuffmanNode | None = None
-    ) -> None:
-        self.frequency = frequency
-        self.data = data
-        self.left = left
-        self.right = right
+PACK_CHUNK_SIZE = 64 * 1024
+MODES = ("char", "word")
+LOOKUP_BITS = 12
+MAX_CODE_LENGTH = 64
+
+# code table size and bit length that precede the table and packed bits
+BINARY_HEADER = struct.Struct(">IQ")
+# window the lookup table reads from, it holds LOOKUP_BITS at any offset
+WINDOW = struct.Struct(">I")
+
+
+class HuffmanTree:
+    # nodes are indexes into parallel arrays, the first len(symbols) nodes
+    # are leaves and every merge appends an internal node after them
+    def __init__(self, symbols: list[str], frequencies: array) -> None:
+        self.symbols = symbols
+        self.frequencies = frequencies
+        self.left = array("i", [-1]) * len(symbols)
+        self.right = array("i", [-1]) * len(symbols)
 
     def __repr__(self) -> str:
-        return f"<HuffmanNode: freq={self.frequency}, data={repr(self.data)}>"
+        return (f"<HuffmanTree: symbols={len(self.symbols)}, "
+                f"nodes={len(self.frequencies)}>")
+
+    @property
+    def root(self) -> int:
+        return len(self.frequencies) - 1
+
+    def merge(self, first: int, second: int) -> int:
+        self.frequencies.append(
+            self.frequencies[first] + self.frequencies[second]
+        )
+        self.left.append(first)
+        self.right.append(second)
 
-    def __lt__(self, other: HuffmanNode) -> bool:
-        return self.frequency < other.frequency
+        return self.root
 
 
-def generate_huffman_tree(mappings: dict[str, int]) -> HuffmanNode:
+class HuffmanEncoding(NamedTuple):
+    packed: bytes
+    bit_length: int
+    code_lengths: dict[str, int]
+
+
+def generate_huffman_tree(mappings: dict[str, int]) -> HuffmanTree:
     # time complexity - O(nlogn) where n = len(mappings)
     # space complexity - O(n) where n = len(mappings)
 
-    heap = [HuffmanNode(freq, char) for char, freq in mappings.items()]
+    tree = HuffmanTree(list(mappings), array("q", mappings.values()))
+    # node indexes are unique, so ties on frequency are broken by creation
+    # order and tuples never compare further than the index
+    heap = [(freq, index) for index, freq in enumerate(tree.frequencies)]
     heapq.heapify(heap)  # build a min-heap
 
     while len(heap) > 1:
-        first = heapq.heappop(heap)  # first smallest node
-        second = heapq.heappop(heap)  # second smallest node
-        merged_node = HuffmanNode(
-            first.frequency + second.frequency, None, first, second
-        )  # merges two nodes into a new internal one
-        heapq.heappush(heap, merged_node)
+        first_freq, first = heapq.heappop(heap)  # first smallest node
+        second_freq, second = heapq.heappop(heap)  # second smallest node
+        merged = tree.merge(first, second)  # new internal node
+        heapq.heappush(heap, (first_freq + second_freq, merged))
+
+    return tree
+
 
-    return heap[0]
+def get_code_lengths(tree: HuffmanTree) -> dict[str, int]:
+    number_of_leaves = len(tree.symbols)
 
+    # a text of a single repeated character still needs one bit per char
+    if number_of_leaves == 1:
+        return {tree.symbols[0]: 1}
 
-def create_codes(
-    node: HuffmanNode | None, bit_stream: str, codebook: dict[str, str]
-) -> None:
-    if node is None:
-        return None
+    depths = array("i", [0]) * len(tree.frequencies)
 
-    # if node is a leaf, store the bit stream as its code
-    if node.left is None and node.right is None:
-        codebook[node.data] = bit_stream
-        return None
+    # parents are always created after their children, so walking the
+    # internal nodes from the root down sets every depth before it is read
+    for node in range(tree.root, number_of_leaves - 1, -1):
+        depths[tree.left[node]] = depths[node] + 1
+        depths[tree.right[node]] = depths[node] + 1
 
-    # traverse left and right subtrees
-    create_codes(node.left, bit_stream + "0", codebook)
-    create_codes(node.right, bit_stream + "1", codebook)
+    return dict(zip(tree.symbols, depths[:number_of_leaves]))
 
 
-def encode(text: str) -> tuple[str, HuffmanNode | None]:
+def generate_canonical_codes(
+    code_lengths: dict[str, int]
+) -> dict[str, tuple[int, int]]:
+    # canonical codes are fully defined by the code lengths: symbols sorted
+    # by length, then by symbol, get consecutive codes
+    codes = {}
+    code = 0
+    previous_length = 0
+
+    for symbol, length in sorted(
+        code_lengths.items(), key=lambda item: (item[1], item[0])
+    ):
+        code <<= length - previous_length
+        codes[symbol] = (code, length)
+        code += 1
+        previous_length = length
+
+    return codes
+
+
+def generate_codebook(code_lengths: dict[str, int]) -> dict[str, str]:
+    return {
+        symbol: format(code, f"0{length}b")
+        for symbol, (code, length)
+        in generate_canonical_codes(code_lengths).items()
+    }
+
+
+def encode_packed(text: str, mode: str = "char") -> HuffmanEncoding:
     if not text:
-        return "", None
+        return HuffmanEncoding(b"", 0, {})
+
+    symbols = get_symbols(text, mode)
+    code_lengths = generate_code_lengths(symbols)
+    packed, bit_length = pack_bits(symbols, generate_codebook(code_lengths))
+
+    return HuffmanEncoding(packed, bit_length, code_lengths)
 
-    frequency_map = generate_frequency_map(text)
+
+def get_symbols(text: str, mode: str) -> Sequence[str]:
+    # characters, or tokens of the TF tokenizer with the separators between
+    # them, both alphabets join back into the original text
+    if mode == "word":
+        return split_with_separators(text)
+
+    return text
+
+
+def generate_code_lengths(symbols: Sequence[str]) -> dict[str, int]:
+    frequency_map = generate_frequency_map(symbols)
     root = generate_huffman_tree(frequency_map)
-    code_book = generate_codebook(root)
-    encoded_text = ''.join(code_book[char] for char in text)
 
-    return encoded_text, root
+    return get_code_lengths(root)
+
+
+def get_encoding_stats(text: str, mode: str) -> dict[str, int | float]:
+    symbols = get_symbols(text, mode)
+    frequency_map = generate_frequency_map(symbols)
+    number_of_symbols = len(symbols)
+
+    if not number_of_symbols:
+        return {
+            "symbols": 0, "alphabet_size": 0, "encoded_size": 0,
+            "code_table_size": 0, "compressed_size": 0,
+            "average_code_length": 0.0, "entropy": 0.0
+        }
+
+    code_lengths = get_code_lengths(generate_huffman_tree(frequency_map))
+    bit_length = sum(
+        frequency * code_lengths[symbol]
+        for symbol, frequency in frequency_map.items()
+    )
+    probabilities = (
+        frequency / number_of_symbols for frequency in frequency_map.values()
+    )
+    entropy = -sum(p * math.log2(p) for p in probabilities)
+    encoded_size = -(-bit_length // 8)
+    code_table_size = len(
+        json.dumps(code_lengths, ensure_ascii=False).encode("utf-8")
+    )
+
+    return {
+        "symbols": number_of_symbols,
+        "alphabet_size": len(frequency_map),
+        "encoded_size": encoded_size,
+        "code_table_size": code_table_size,
+        "compressed_size": (
+            BINARY_HEADER.size + code_table_size + encoded_size
+        ),
+        "average_code_length": bit_length / number_of_symbols,
+        "entropy": entropy
+    }
+
+
+def pack_bits(
+    symbols: Sequence[str], codebook: dict[str, str]
+) -> tuple[bytes, int]:
+    packed = bytearray()
+    pending_bits = ""
+    bit_length = 0
+
+    # codes are joined per chunk and converted to bytes at C speed, the
+    # bits that do not fill a whole byte are carried to the next chunk
+    for start in range(0, len(symbols), PACK_CHUNK_SIZE):
+        chunk = symbols[start:start + PACK_CHUNK_SIZE]
+        chunk_bits = "".join(map(codebook.__getitem__, chunk))
+        bit_length += len(chunk_bits)
+
+        bits = pending_bits + chunk_bits
+        whole_bits = len(bits) - len(bits) % 8
+
+        if whole_bits:
+            packed += int(bits[:whole_bits], 2).to_bytes(whole_bits // 8)
+
+        pending_bits = bits[whole_bits:]
+
+    # the last byte is padded with zeros, bit_length tells where data ends
+    if pending_bits:
+        packed += int(pending_bits.ljust(8, "0"), 2).to_bytes(1)
+
+    return bytes(packed), bit_length
 
 
-def generate_frequency_map(text: str) -> dict[str, int]:
-    frequency_map = {}
+def unpack_bits(encoding: HuffmanEncoding) -> str:
+    if not encoding.bit_length:
+        return ""
+
+    bits = format(
+        int.from_bytes(encoding.packed), f"0{len(encoding.packed) * 8}b"
+    )
+
+    return bits[:encoding.bit_length]
+
+
+def serialize_encoding(encoding: HuffmanEncoding) -> bytes:
+    code_table = json.dumps(encoding.code_lengths, ensure_ascii=False)
+    code_table = code_table.encode("utf-8")
+    header = BINARY_HEADER.pack(len(code_table), encoding.bit_length)
+
+    return header + code_table + encoding.packed
+
+
+def deserialize_encoding(payload: bytes) -> HuffmanEncoding:
+    if len(payload) < BINARY_HEADER.size:
+        raise InvalidHuffmanPayloadError("Encoded payload is too short")
+
+    table_size, bit_length = BINARY_HEADER.unpack_from(payload)
+    table_end = BINARY_HEADER.size + table_size
 
-    for char in text:
-        frequency_map[char] = frequency_map.get(char, 0) + 1
+    try:
+        code_lengths = json.loads(payload[BINARY_HEADER.size:table_end])
+    except ValueError:
+        raise InvalidHuffmanPayloadError("Code table is not valid JSON")
 
-    return frequency_map
+    return HuffmanEncoding(payload[table_end:], bit_length, code_lengths)
 
 
-def generate_codebook(root: HuffmanNode) -> dict[str, str]:
-    codebook = {}
-    create_codes(root, "", codebook)
+def generate_frequency_map(symbols: Sequence[str]) -> dict[str, int]:
+    return dict(Counter(symbols))
 
-    return codebook
 
+def decode_packed(
+    encoding: HuffmanEncoding, max_size: int | None = None
+) -> str:
+    packed, bit_length, code_lengths = encoding
+    validate_encoding(encoding)
 
-def decode(encoded_text: str, root: HuffmanNode | None) -> str:
-    if root is None:
+    if not bit_length:
         return ""
 
-    decoded_text = ""
-    current_node = root
+    max_length = max(code_lengths.values())
+    size_limit = math.inf if max_size is None else max_size
+
+    # the bits hold at least this many symbols, each at least as long as
+    # the shortest one, so such payloads are rejected before decoding
+    if (
+        -(-bit_length // max_length) * min(map(len, code_lengths))
+        > size_limit
+    ):
+        raise InvalidHuffmanPayloadError(
+            f"Decoded contents would exceed {max_size} characters"
+        )
+
+    codes = generate_canonical_codes(code_lengths)
+    lookup_bits = min(max_length, LOOKUP_BITS)
+    lookup_table = build_lookup_table(codes, lookup_bits)
+    long_codes = {
+        (length, code): symbol
+        for symbol, (code, length) in codes.items()
+        if length > lookup_bits
+    }
+
+    data = packed + bytes(WINDOW.size)
+    mask = (1 << lookup_bits) - 1
+    shift = WINDOW.size * 8 - lookup_bits
+    decoded_symbols = []
+    decoded_size = 0
+    position = 0
+
+    # every step peeks lookup_bits at once and the table tells which symbol
+    # starts there and how many bits its code takes
+    while position < bit_length:
+        window = WINDOW.unpack_from(data, position >> 3)[0]
+        entry = lookup_table[(window >> (shift - (position & 7))) & mask]
+
+        if entry is None:
+            symbol, length = read_long_code(
+                data, position, bit_length, lookup_bits, max_length,
+                long_codes
+            )
+        else:
+            symbol, length = entry
+
+        # a short code may stand for a long symbol, so the size is checked
+        # as the output grows rather than trusted from the input size
+        decoded_size += len(symbol)
+        if decoded_size > size_limit:
+            raise InvalidHuffmanPayloadError(
+                f"Decoded contents exceed {max_size} characters"
+            )
+
+        decoded_symbols.append(symbol)
+        position += length
+
+    if position != bit_length:
+        raise InvalidHuffmanPayloadError(
+            "Encoded bits end in the middle of a code"
+        )
+
+    return "".join(decoded_symbols)
+
+
+def build_lookup_table(
+    codes: dict[str, tuple[int, int]], lookup_bits: int
+) -> list[tuple[str, int] | None]:
+    lookup_table = [None] * (1 << lookup_bits)
+
+    for symbol, (code, length) in codes.items():
+        if length > lookup_bits:
+            continue
+
+        # every index starting with the code maps to it, whatever follows
+        start = code << (lookup_bits - length)
+        end = start + (1 << (lookup_bits - length))
+        lookup_table[start:end] = [(symbol, length)] * (end - start)
+
+    return lookup_table
+
+
+def read_long_code(
+    data: bytes,
+    position: int,
+    bit_length: int,
+    lookup_bits: int,
+    max_length: int,
+    long_codes: dict[tuple[int, int], str]
+) -> tuple[str, int]:
+    code = 0
+
+    # an incomplete code table leaves bit patterns without a symbol, so
+    # reading stops at the last encoded bit instead of running past it
+    for length in range(1, min(max_length, bit_length - position) + 1):
+        bit_position = position + length - 1
+        bit = (data[bit_position >> 3] >> (7 - (bit_position & 7))) & 1
+        code = (code << 1) | bit
+
+        if length > lookup_bits and (length, code) in long_codes:
+            return long_codes[(length, code)], length
+
+    raise InvalidHuffmanPayloadError("Encoded bits contain an unknown code")
+
+
+def validate_encoding(encoding: HuffmanEncoding) -> None:
+    packed, bit_length, code_lengths = encoding
+
+    if not isinstance(bit_length, int) or bit_length < 0:
+        raise InvalidHuffmanPayloadError(
+            "Bit length must be a non-negative integer"
+        )
+
+    if not isinstance(code_lengths, dict):
+        raise InvalidHuffmanPayloadError("Code lengths must be an object")
+
+    if bit_length > len(packed) * 8:
+        raise InvalidHuffmanPayloadError(
+            "Bit length exceeds the size of encoded contents"
+        )
+
+    if bit_length and not code_lengths:
+        raise InvalidHuffmanPayloadError("Code table is empty")
 
-    for bit in encoded_text:
-        current_node = current_node.left if bit == "0" else current_node.right
+    # every code must decode to some text, otherwise the size guards never
+    # grow and a payload of such codes keeps the decoder busy for nothing
+    if "" in code_lengths:
+        raise InvalidHuffmanPayloadError("Code table contains an empty symbol")
 
-        # if leaf node is reached, append character to result
-        if current_node.left is None and current_node.right is None:
-            decoded_text += current_node.data
-            current_node = root  # restart for next character
+    for length in code_lengths.values():
+        if (
+            not isinstance(length, int)
+            or not 1 <= length <= MAX_CODE_LENGTH
+        ):
+            raise InvalidHuffmanPayloadError(
+                f"Code lengths must be integers from 1 to {MAX_CODE_LENGTH}"
+            )
 
-    return decoded_text
+    # Kraft inequality, lengths that do not fit a prefix code are rejected
+    if sum(
+        1 << (MAX_CODE_LENGTH - length) for length in code_lengths.values()
+    ) > 1 << MAX_CODE_LENGTH:
+        raise InvalidHuffmanPayloadError(
+            "Code lengths do not form a prefix code"
+        )
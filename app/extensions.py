@@ -1,7 +1,31 @@
+import redis
+from flask import Flask, current_app
 from flask_bcrypt import Bcrypt
 from flask_caching import Cache
 from flask_jwt_extended import JWTManager
 
+
+class RedisClient:
+    # the Redis server behind the cache, for commands the cache API lacks
+    def init_app(self, app: Flask) -> None:
+        if app.config["CACHE_TYPE"] != "RedisCache":
+            if not app.testing:
+                raise RuntimeError(
+                    "CACHE_TYPE must be RedisCache outside the test config"
+                )
+            return
+
+        app.extensions["redis"] = redis.Redis(
+            host=app.config["CACHE_REDIS_HOST"],
+            port=int(app.config["CACHE_REDIS_PORT"])
+        )
+
+    @property
+    def client(self) -> redis.Redis | None:
+        return current_app.extensions.get("redis")
+
+
 bcrypt = Bcrypt()
 jwt = JWTManager()
 cache = Cache()
+redis_client = RedisClient()
@@ -0,0 +1,19 @@
+from flask_restx import fields
+
+from app.jobs.namespace import api
+
+job_model = api.model("Job", {
+    "job_id": fields.String,
+    "status": fields.String(enum=["queued", "running", "finished", "failed"]),
+    "progress": fields.Float,
+    "updated_at": fields.Float(
+        description="Unix time the job last reported its state, a queued "
+                    "or running job silent for 10 minutes is failed"
+    ),
+    "result": fields.Raw(required=False),
+    "error": fields.String(required=False)
+})
+
+message_model = api.model("Message", {
+    "message": fields.String
+})
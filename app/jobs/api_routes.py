@@ -0,0 +1,35 @@
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restx import Resource
+
+from app.jobs.api_models import job_model, message_model
+from app.jobs.namespace import api
+from app.jobs.services import get_user_job
+
+
+class SecuredResource(Resource):
+    method_decorators = [jwt_required()]
+
+
+@api.route("/<string:job_id>")
+@api.param("job_id", "The job identifier")
+class JobResource(SecuredResource):
+    @api.doc(
+        description="Get the status, progress and, once finished, the "
+                    "result of a background statistics job",
+        security="BearerAuth",
+        responses={
+            200: ("Job was found", job_model),
+            401: ("Missing JWT in headers or cookie", message_model),
+            404: ("User does not have such job", message_model)
+        }
+    )
+    def get(self, job_id):
+        """Get background job status"""
+        username = get_jwt_identity()
+        job = get_user_job(username, job_id)
+
+        if job is None:
+            return {"message": "This user does not have such job"}, 404
+
+        job.pop("username")
+        return job, 200
@@ -0,0 +1,5 @@
+from flask_restx import Namespace
+
+api = Namespace(
+    "Jobs", description="Status and results of background statistics jobs"
+)
@@ -0,0 +1,109 @@
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from flask import current_app
+
+from app.extensions import cache
+
+JOB_TIMEOUT = 24 * 3600
+JOB_HEARTBEAT_TIMEOUT = 10 * 60
+ACTIVE_STATUSES = ("queued", "running")
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=current_app.config["STATISTICS_JOBS_POOL_SIZE"],
+            thread_name_prefix="statistics-job"
+        )
+
+    return _executor
+
+
+def get_job(job_id: str) -> dict[str, Any] | None:
+    return cache.get(f"job:{job_id}")
+
+
+def get_user_job(username: str, job_id: str) -> dict[str, Any] | None:
+    job = get_job(job_id)
+
+    if job is None or job["username"] != username:
+        return None
+
+    if job["status"] in ACTIVE_STATUSES and not is_job_alive(job):
+        job.update(status="failed", error="Job stopped reporting progress")
+
+    return job
+
+
+def is_job_alive(job: dict[str, Any]) -> bool:
+    # only the worker running a job moves it on, so a job it stopped
+    # reporting on was lost with the worker and will never finish
+    return time.time() - job["updated_at"] <= JOB_HEARTBEAT_TIMEOUT
+
+
+def save_job(job: dict[str, Any]) -> None:
+    job["updated_at"] = time.time()
+    cache.set(f"job:{job['job_id']}", job, timeout=JOB_TIMEOUT)
+
+
+def update_job(job_id: str, **fields: Any) -> None:
+    job = get_job(job_id)
+
+    if job is not None:
+        job.update(fields)
+        save_job(job)
+
+
+def submit_job(
+    username: str, func: Callable[..., Any], *args: Any
+) -> dict[str, Any]:
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "username": username,
+        "status": "queued",
+        "progress": 0.0
+    }
+    save_job(job)
+
+    app = current_app._get_current_object()
+    get_executor().submit(run_job, app, job["job_id"], func, *args)
+
+    return job
+
+
+def submit_task(func: Callable[..., Any], *args: Any) -> None:
+    app = current_app._get_current_object()
+    get_executor().submit(run_task, app, func, *args)
+
+
+def run_task(app, func: Callable[..., Any], *args: Any) -> None:
+    with app.app_context():
+        try:
+            func(*args)
+        except Exception:
+            app.logger.exception("Background task %s failed", func.__name__)
+
+
+def run_job(app, job_id: str, func: Callable[..., Any], *args: Any) -> None:
+    with app.app_context():
+        update_job(job_id, status="running")
+
+        def report_progress(done: int, total: int) -> None:
+            progress = round(done / total, 2) if total else 1.0
+            update_job(job_id, progress=progress)
+
+        try:
+            result = func(*args, report_progress=report_progress)
+        except Exception as error:
+            app.logger.exception("Job %s failed", job_id)
+            update_job(job_id, status="failed", error=str(error))
+        else:
+            update_job(job_id, status="finished", progress=1.0, result=result)
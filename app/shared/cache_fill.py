@@ -0,0 +1,73 @@
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from app.extensions import cache
+from app.shared.tiered_cache import get_cached, set_cached
+
+FILL_LOCK_TIMEOUT = 60
+FILL_WAIT_TIMEOUT = 30
+FILL_POLL_INTERVAL = 0.05
+
+METRICS = ("computed", "coalesced", "wait_timeouts")
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int,
+    dump: Callable[[Any], Any] | None = None,
+    load: Callable[[Any], Any] | None = None
+) -> Any:
+    cached_value = get_cached(key, load)
+
+    if cached_value is not None:
+        return cached_value
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + FILL_WAIT_TIMEOUT
+
+    # only the request holding the lock computes the value, the rest wait
+    # for it to show up in the cache instead of recomputing it themselves
+    while not cache.add(lock_key, token, timeout=FILL_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            increment_metric("wait_timeouts")
+            return compute_and_store(key, compute, timeout, dump)
+
+        time.sleep(FILL_POLL_INTERVAL)
+        cached_value = get_cached(key, load)
+
+        if cached_value is not None:
+            increment_metric("coalesced")
+            return cached_value
+
+    try:
+        return compute_and_store(key, compute, timeout, dump)
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def compute_and_store(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int,
+    dump: Callable[[Any], Any] | None = None
+) -> Any:
+    value = compute()
+    set_cached(key, value, timeout, dump)
+    increment_metric("computed")
+
+    return value
+
+
+def increment_metric(name: str) -> None:
+    cache.cache.inc(f"cache_fill:{name}")
+
+
+def get_cache_fill_metrics() -> dict[str, int]:
+    return {
+        name: int(cache.get(f"cache_fill:{name}") or 0) for name in METRICS
+    }
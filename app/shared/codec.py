@@ -0,0 +1,84 @@
+import lzma
+import struct
+import zlib
+
+import numpy as np
+from flask import current_app
+
+CODEC_MAGIC = b"FQ"
+CODEC_VERSION = 1
+COMPRESSION_THRESHOLD = 4 * 1024
+# level 1 is about five times faster than the default on term matrices
+# and its output is only a few percent larger
+ZLIB_LEVEL = 1
+
+# magic, codec version, compression id
+HEADER = struct.Struct("<2sBB")
+COMPRESSIONS = {"none": 0, "zlib": 1, "lzma": 2}
+TERMS_SEPARATOR = "\n"
+
+
+def encode_payload(body: bytes) -> bytes:
+    compression = current_app.config["CACHE_COMPRESSION"]
+
+    if len(body) < COMPRESSION_THRESHOLD:
+        compression = "none"
+
+    if compression == "zlib":
+        body = zlib.compress(body, ZLIB_LEVEL)
+    elif compression == "lzma":
+        body = lzma.compress(body)
+
+    header = HEADER.pack(
+        CODEC_MAGIC, CODEC_VERSION, COMPRESSIONS[compression]
+    )
+
+    return header + body
+
+
+def decode_payload(payload: bytes) -> bytes | None:
+    if not isinstance(payload, bytes) or len(payload) < HEADER.size:
+        return None
+
+    magic, version, compression = HEADER.unpack_from(payload)
+
+    # entries written by another codec version are treated as cache misses
+    if magic != CODEC_MAGIC or version != CODEC_VERSION:
+        return None
+
+    body = payload[HEADER.size:]
+
+    if compression == COMPRESSIONS["zlib"]:
+        return zlib.decompress(body)
+    if compression == COMPRESSIONS["lzma"]:
+        return lzma.decompress(body)
+
+    return body
+
+
+def encode_term_values(term_values: dict[str, float]) -> bytes:
+    terms = TERMS_SEPARATOR.join(term_values).encode("utf-8")
+    values = np.fromiter(
+        term_values.values(), dtype="<f8", count=len(term_values)
+    )
+
+    return encode_payload(
+        struct.pack("<I", len(terms)) + terms + values.tobytes()
+    )
+
+
+def decode_term_values(payload: bytes) -> dict[str, float] | None:
+    body = decode_payload(payload)
+
+    if body is None:
+        return None
+
+    (terms_size,) = struct.unpack_from("<I", body)
+    terms_end = 4 + terms_size
+    terms = body[4:terms_end].decode("utf-8")
+    values = np.frombuffer(body, dtype="<f8", offset=terms_end)
+
+    if not terms:
+        return {}
+
+    return dict(zip(terms.split(TERMS_SEPARATOR), values.tolist()))
@@ -4,3 +4,11 @@ class DuplicateDocumentError(Exception):
 
 class EmptyFileError(Exception):
     pass
+
+
+class DocumentTooLargeError(Exception):
+    pass
+
+
+class InvalidHuffmanPayloadError(Exception):
+    pass
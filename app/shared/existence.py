@@ -0,0 +1,13 @@
+from sqlalchemy import ColumnElement, Exists, literal_column, select
+
+from app.database import db
+
+
+def exists_where(*criteria: ColumnElement[bool]) -> Exists:
+    # EXISTS (SELECT 1 ...) stops at the first matching row and reads no
+    # columns, so large ones like document contents stay on disk
+    return select(literal_column("1")).where(*criteria).exists()
+
+
+def row_exists(*criteria: ColumnElement[bool]) -> bool:
+    return db.session.scalar(select(exists_where(*criteria)))
@@ -1,38 +1,199 @@
+import codecs
 import hashlib
 import os
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter
+from collections.abc import Iterator
+from typing import IO, NamedTuple
 
 from flask import current_app
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
-from app.shared.exceptions import EmptyFileError
+from app.shared.exceptions import DocumentTooLargeError, EmptyFileError
+from app.shared.scheduler import (
+    count_file_terms, count_file_terms_many, should_run_inline
+)
+from app.shared.tokenizer import TOKEN_PATTERN
 
+CHUNK_SIZE = 64 * 1024
+ZIP_EXTENSIONS = (".zip",)
+TAR_EXTENSIONS = (".tar.gz", ".tgz")
 
-def compute_content_hash(content: str) -> str:
-    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class IngestedFile(NamedTuple):
+    filename: str
+    temp_path: str
+    content_hash: str
+    raw_content_hash: str
+    size: int
+    word_counts: Counter[str] | None
+    total_words: int
 
 
 def is_file_invalid(file: FileStorage) -> bool:
     return not file or not file.filename.endswith(".txt")
 
 
-def save_uploaded_file(file: FileStorage, username: str) -> tuple[str, str]:
-    filename, contents = extract_file_contents(file)
-    user_folder = get_user_media_path(username)
-    file_path = os.path.join(user_folder, filename)
-    write_file_to_disk(file_path, contents)
+def is_archive(filename: str) -> bool:
+    return filename.endswith(ZIP_EXTENSIONS + TAR_EXTENSIONS)
+
+
+def ingest_uploaded_file(file: FileStorage, folder: str) -> IngestedFile:
+    ingested_file = ingest_stream(file.filename, file.stream, folder)
+
+    try:
+        return count_ingested_file(ingested_file)
+    except Exception:
+        discard_file(ingested_file.temp_path)
+        raise
+
+
+def ingest_stream(
+    filename: str,
+    stream: IO[bytes],
+    folder: str,
+    max_size: int | None = None
+) -> IngestedFile:
+    filename = secure_filename(filename)
+    content_hash = hashlib.sha256()
+    raw_content_hash = hashlib.sha256()
+    word_counts = Counter()
+    total_words = 0
+    text_length = 0
+
+    temp_file = tempfile.NamedTemporaryFile(
+        dir=folder, suffix=".part", delete=False
+    )
+    try:
+        with temp_file:
+            for text in iter_text_pieces(stream, temp_file, max_size):
+                raw_content_hash.update(text.encode("utf-8"))
+                lowercase_text = text.lower()
+                content_hash.update(lowercase_text.encode("utf-8"))
+                text_length += len(text)
+
+                # large documents are counted afterwards from the spilled
+                # file in the tokenizer pool, so they do not pin the worker
+                if should_run_inline(text_length):
+                    tokens = TOKEN_PATTERN.findall(lowercase_text)
+                    word_counts.update(tokens)
+                    total_words += len(tokens)
+                else:
+                    word_counts = None
+
+            size = temp_file.tell()
+
+        if size == 0:
+            raise EmptyFileError("Uploading empty files is not allowed")
+    except Exception:
+        discard_file(temp_file.name)
+        raise
+
+    return IngestedFile(
+        filename, temp_file.name, content_hash.hexdigest(),
+        raw_content_hash.hexdigest(), size, word_counts, total_words
+    )
+
+
+def count_ingested_file(ingested_file: IngestedFile) -> IngestedFile:
+    if ingested_file.word_counts is not None:
+        return ingested_file
+
+    word_counts, total_words = count_file_terms(ingested_file.temp_path)
+
+    return ingested_file._replace(
+        word_counts=word_counts, total_words=total_words
+    )
+
+
+def count_ingested_files(
+    ingested_files: list[IngestedFile]
+) -> list[IngestedFile]:
+    # files left uncounted by ingestion are counted in one batch, so the
+    # pool processes them side by side instead of one after another
+    pending_indexes = [
+        index for index, ingested_file in enumerate(ingested_files)
+        if ingested_file.word_counts is None
+    ]
+    word_stats = count_file_terms_many(
+        [ingested_files[index].temp_path for index in pending_indexes]
+    )
+    counted_files = list(ingested_files)
+
+    for index, (word_counts, total_words) in zip(
+        pending_indexes, word_stats
+    ):
+        counted_files[index] = ingested_files[index]._replace(
+            word_counts=word_counts, total_words=total_words
+        )
+
+    return counted_files
+
+
+def iter_text_pieces(
+    stream: IO[bytes], spill_file: IO[bytes], max_size: int | None = None
+) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending_text = ""
+
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        spill_file.write(chunk)
+
+        # sizes declared in archive headers cannot be trusted, so the limit
+        # is checked on the bytes actually read
+        if max_size is not None and spill_file.tell() > max_size:
+            raise DocumentTooLargeError("Document is too large")
+
+        text = pending_text + decoder.decode(chunk)
+        # lowercasing and tokenizing never look across whitespace, so the
+        # text up to it is final and the rest waits for the next chunk
+        split_index = max(text.rfind(" "), text.rfind("\n")) + 1
+        pending_text = text[split_index:]
+
+        yield text[:split_index]
+
+    yield pending_text + decoder.decode(b"", final=True)
+
+
+def iter_archive_members(
+    file: FileStorage
+) -> Iterator[tuple[str, IO[bytes]]]:
+    # members are yielded one at a time and must be read before the next
+    # one, a tar.gz is decompressed as a stream and never seeks back
+    if file.filename.endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(file.stream) as archive:
+            for member in archive.infolist():
+                if not member.is_dir():
+                    with archive.open(member) as stream:
+                        yield member.filename, stream
+        return
+
+    with tarfile.open(fileobj=file.stream, mode="r|gz") as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, archive.extractfile(member)
+
 
-    return file_path, contents
+def store_ingested_file(ingested_file: IngestedFile, folder: str) -> str:
+    file_path = os.path.join(folder, ingested_file.filename)
+    os.replace(ingested_file.temp_path, file_path)
 
+    return file_path
 
-def extract_file_contents(file: FileStorage) -> tuple[str, str]:
-    filename = secure_filename(file.filename)
-    contents = file.read().decode("utf-8")
 
-    if not contents:
-        raise EmptyFileError("Uploading empty files is not allowed")
+def read_ingested_file(ingested_file: IngestedFile) -> str:
+    with open(
+        ingested_file.temp_path, "r", encoding="utf-8", newline=""
+    ) as f:
+        return f.read()
 
-    return filename, contents
+
+def discard_file(file_path: str) -> None:
+    if os.path.exists(file_path):
+        os.remove(file_path)
 
 
 def get_user_media_path(username: str) -> str:
@@ -41,8 +202,3 @@ def get_user_media_path(username: str) -> str:
     os.makedirs(user_media_path, exist_ok=True)
 
     return user_media_path
-
-
-def write_file_to_disk(file_path: str, contents: str) -> None:
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(contents)
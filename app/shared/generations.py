@@ -0,0 +1,86 @@
+import time
+from collections.abc import Iterable
+
+from flask import current_app
+
+from app.extensions import cache, redis_client
+from app.shared.tiered_cache import delete_cached
+
+
+def get_generation_start() -> int:
+    # counters start from the current time, so a counter lost to eviction
+    # never comes back with a generation that older entries were cached at
+    return time.time_ns() // 1000
+
+
+def get_generation(generation_key: str) -> int:
+    generation = cache.get(generation_key)
+
+    if generation is None:
+        cache.add(generation_key, get_generation_start(), timeout=0)
+        generation = cache.get(generation_key)
+
+    return int(generation)
+
+
+def get_document_generation(document_id: int) -> int:
+    return get_generation(f"generation:document:{document_id}")
+
+
+def get_collection_generation(collection_id: int) -> int:
+    return get_generation(f"generation:collection:{collection_id}")
+
+
+def get_document_tf_key(document_id: int) -> str:
+    return f"tf:{document_id}:{get_document_generation(document_id)}"
+
+
+def get_collection_matrix_key(collection_id: int) -> str:
+    generation = get_collection_generation(collection_id)
+    return f"collection_matrix:{collection_id}:{generation}"
+
+
+def bump_generations(
+    collection_ids: Iterable[int] = (), document_ids: Iterable[int] = ()
+) -> None:
+    prefixes = (
+        [(f"collection_matrix:{collection_id}",
+          f"generation:collection:{collection_id}")
+         for collection_id in collection_ids]
+        + [(f"tf:{document_id}", f"generation:document:{document_id}")
+           for document_id in document_ids]
+    )
+
+    if not prefixes:
+        return
+
+    generations = increment_generations(
+        [generation_key for _, generation_key in prefixes]
+    )
+    # entries of the previous generation are unreachable already, deleting
+    # them only frees memory before their TTL runs out
+    delete_cached(*[
+        f"{prefix}:{generation - 1}"
+        for (prefix, _), generation in zip(prefixes, generations)
+    ])
+
+
+def increment_generations(generation_keys: list[str]) -> list[int]:
+    start = get_generation_start()
+    client = redis_client.client
+
+    # only the test config runs without Redis, see RedisClient.init_app
+    if client is None:
+        generations = []
+        for generation_key in generation_keys:
+            cache.cache.add(generation_key, start, timeout=0)
+            generations.append(cache.cache.inc(generation_key))
+        return generations
+
+    key_prefix = current_app.config["CACHE_KEY_PREFIX"]
+    pipeline = client.pipeline(transaction=True)
+    for generation_key in generation_keys:
+        pipeline.set(f"{key_prefix}{generation_key}", start, nx=True)
+        pipeline.incr(f"{key_prefix}{generation_key}")
+
+    return pipeline.execute()[1::2]
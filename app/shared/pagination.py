@@ -0,0 +1,31 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+
+from flask_restx import inputs
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    value = f"{created_at.isoformat()}{CURSOR_SEPARATOR}{item_id}"
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(value: str) -> tuple[datetime, int]:
+    try:
+        decoded = base64.urlsafe_b64decode(value.encode("ascii"))
+        created_at, item_id = decoded.decode("utf-8").split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def utc_datetime(value: str) -> datetime:
+    # timestamps are stored as naive UTC, so aware input is converted to it
+    moment = inputs.datetime_from_iso8601(value)
+
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return moment
@@ -0,0 +1,81 @@
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from app.shared.tfidf_stats import get_file_word_stats, get_word_stats
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    pool_size = current_app.config["TOKENIZER_POOL_SIZE"]
+
+    if pool_size <= 0:
+        return None
+
+    # created lazily so every gunicorn worker owns its pool, forkserver keeps
+    # pool processes from inheriting the worker's sockets and threads
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=pool_size,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+
+    return _executor
+
+
+def reset_executor() -> None:
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def should_run_inline(size: int) -> bool:
+    return size <= current_app.config["TOKENIZER_INLINE_MAX_CHARS"]
+
+
+def count_terms(text: str) -> tuple[Counter[str], int]:
+    executor = None if should_run_inline(len(text)) else get_executor()
+
+    if executor is None:
+        return get_word_stats(text)
+
+    try:
+        return executor.submit(get_word_stats, text).result()
+    except BrokenProcessPool:
+        reset_executor()
+        return get_word_stats(text)
+
+
+def count_file_terms(file_path: str) -> tuple[Counter[str], int]:
+    executor = get_executor()
+
+    if executor is None:
+        return get_file_word_stats(file_path)
+
+    try:
+        return executor.submit(get_file_word_stats, file_path).result()
+    except BrokenProcessPool:
+        reset_executor()
+        return get_file_word_stats(file_path)
+
+
+def count_file_terms_many(
+    file_paths: list[str]
+) -> list[tuple[Counter[str], int]]:
+    executor = get_executor() if file_paths else None
+
+    if executor is None:
+        return [get_file_word_stats(file_path) for file_path in file_paths]
+
+    try:
+        return list(executor.map(get_file_word_stats, file_paths))
+    except BrokenProcessPool:
+        reset_executor()
+        return [get_file_word_stats(file_path) for file_path in file_paths]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import io
+import sys
+from array import array
+from collections.abc import Iterable
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from app.shared.codec import decode_payload, encode_payload
+
+# tokens are runs of word characters, so a newline can never be part of one
+VOCABULARY_SEPARATOR = "\n"
+
+
+class TermMatrix:
+    def __init__(
+        self,
+        document_ids: np.ndarray,
+        vocabulary: list[str],
+        counts: csr_matrix
+    ) -> None:
+        self.document_ids = document_ids
+        self.vocabulary = vocabulary
+        self.counts = counts
+        self.term_index = {term: i for i, term in enumerate(vocabulary)}
+
+    def __repr__(self) -> str:
+        documents, terms = self.counts.shape
+        return f"<TermMatrix: documents={documents}, terms={terms}>"
+
+    @property
+    def number_of_documents(self) -> int:
+        return self.counts.shape[0]
+
+    def memory_size(self) -> int:
+        arrays_size = sum(
+            array.nbytes for array in (
+                self.document_ids, self.counts.data, self.counts.indices,
+                self.counts.indptr
+            )
+        )
+        # the index shares its keys with the vocabulary, so only its table
+        # and the integer values are added on top of the strings
+        vocabulary_size = sys.getsizeof(self.vocabulary) + sum(
+            map(sys.getsizeof, self.vocabulary)
+        )
+        term_index_size = (
+            sys.getsizeof(self.term_index)
+            + len(self.term_index) * sys.getsizeof(len(self.term_index))
+        )
+
+        return arrays_size + vocabulary_size + term_index_size
+
+    @classmethod
+    def from_documents_terms(
+        cls, documents_terms: Iterable[tuple[int, dict[str, int]]]
+    ) -> TermMatrix:
+        term_index = {}
+        document_ids = array("q")
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("q")
+
+        for document_id, term_counts in documents_terms:
+            document_ids.append(document_id)
+            indices.extend(
+                term_index.setdefault(term, len(term_index))
+                for term in term_counts
+            )
+            data.extend(term_counts.values())
+            indptr.append(len(indices))
+
+        counts = csr_matrix(
+            (
+                np.array(data, dtype=np.int32),
+                np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int64)
+            ),
+            shape=(len(document_ids), len(term_index))
+        )
+
+        return cls(
+            np.array(document_ids, dtype=np.int64), list(term_index), counts
+        )
+
+    def term_frequencies(self) -> np.ndarray:
+        term_counts = np.asarray(self.counts.sum(axis=0)).ravel()
+        return term_counts / term_counts.sum()
+
+    def document_frequencies(self) -> np.ndarray:
+        return np.bincount(
+            self.counts.indices, minlength=self.counts.shape[1]
+        )
+
+    def idf(self) -> np.ndarray:
+        number_of_documents = self.number_of_documents
+        return np.log(
+            (number_of_documents + 1) / (1 + self.document_frequencies())
+        )
+
+    def get_least_frequent_tf(self, count: int = 50) -> dict[str, float]:
+        tf = self.term_frequencies()
+        # stable sort keeps first-seen order for ties, like sorted() on dicts
+        least_frequent = np.argsort(tf, kind="stable")[:count]
+
+        return {self.vocabulary[i]: float(tf[i]) for i in least_frequent}
+
+    def get_idf(self, words: list[str]) -> dict[str, float]:
+        idf = self.idf()
+
+        return {
+            word: float(idf[self.term_index[word]])
+            if word in self.term_index else 0.0
+            for word in words
+        }
+
+    def to_bytes(self) -> bytes:
+        vocabulary = VOCABULARY_SEPARATOR.join(self.vocabulary).encode("utf-8")
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            document_ids=self.document_ids,
+            vocabulary=np.frombuffer(vocabulary, dtype=np.uint8),
+            data=self.counts.data,
+            indices=self.counts.indices,
+            indptr=self.counts.indptr,
+            shape=np.array(self.counts.shape, dtype=np.int64)
+        )
+
+        return encode_payload(buffer.getvalue())
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> TermMatrix | None:
+        body = decode_payload(payload)
+
+        if body is None:
+            return None
+
+        with np.load(io.BytesIO(body), allow_pickle=False) as arrays:
+            vocabulary = arrays["vocabulary"].tobytes().decode("utf-8")
+            counts = csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(arrays["shape"])
+            )
+
+            return cls(
+                arrays["document_ids"],
+                vocabulary.split(VOCABULARY_SEPARATOR) if vocabulary else [],
+                counts
+            )
@@ -1,26 +1,31 @@
 from collections import Counter
 
 import math
-from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.shared.tokenizer import iter_tokens
 
 
 def get_word_stats(text: str) -> tuple[Counter[str], int]:
-    tokens = tokenize_text(text)
-    total_words = len(tokens)
-    word_counts = Counter(tokens)
+    word_counts = Counter(iter_tokens(text))
+    total_words = sum(word_counts.values())
 
     return word_counts, total_words
 
 
-def tokenize_text(text: str) -> list[str]:
-    vectorizer = TfidfVectorizer(use_idf=False, norm=None)
-    analyzer = vectorizer.build_analyzer()
+def get_file_word_stats(file_path: str) -> tuple[Counter[str], int]:
+    word_counts = Counter()
+
+    # tokens never span a line break, so the file is counted line by line
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        for line in f:
+            word_counts.update(iter_tokens(line))
 
-    return analyzer(text)
+    return word_counts, sum(word_counts.values())
 
 
-def get_document_tf(document_contents: str) -> dict[str, float] | None:
-    word_counts, total_words = get_word_stats(document_contents)
+def get_document_tf(
+    word_counts: dict[str, int], total_words: int
+) -> dict[str, float]:
     tf_dict = calculate_tf(word_counts, total_words)
     least_frequent_words = get_least_frequent_words(tf_dict)
     tf = {word: tf_dict[word] for word in least_frequent_words}
@@ -28,7 +33,9 @@ def get_document_tf(document_contents: str) -> dict[str, float] | None:
     return tf
 
 
-def calculate_tf(word_counts: Counter, total_words: int) -> dict[str, float]:
+def calculate_tf(
+    word_counts: dict[str, int], total_words: int
+) -> dict[str, float]:
     return {
         word: count / total_words
         for word, count in word_counts.items()
@@ -44,20 +51,12 @@ def get_least_frequent_words(
 
 
 def calculate_idf(
-    documents_in_collection: list[tuple[int, str]]
+    document_frequencies: dict[str, int], number_of_documents: int
 ) -> dict[str, float]:
-    number_of_documents = len(documents_in_collection)
-
     if number_of_documents == 0:
         return {}
 
-    document_frequencies = Counter()
-    for _, contents in documents_in_collection:
-        words_in_document = set(tokenize_text(contents))
-        document_frequencies.update(words_in_document)
-
-    idf = {}
-    for word, df in document_frequencies.items():
-        idf[word] = math.log((number_of_documents + 1) / (1 + df))
-
-    return idf
+    return {
+        word: math.log((number_of_documents + 1) / (1 + df))
+        for word, df in document_frequencies.items()
+    }
@@ -0,0 +1,175 @@
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from flask import current_app
+
+from app.extensions import cache
+
+
+class LocalCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[str, tuple[str, Any, int]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (f"<LocalCache: entries={len(self.entries)}, "
+                f"size={self.size}/{self.max_bytes}>")
+
+    def get(self, key: str, version: str) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] != version:
+                return None
+
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, version: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (version, value, size)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def discard(self, key: str) -> None:
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+
+        if entry is not None:
+            self.size -= entry[2]
+
+
+_local_cache: LocalCache | None = None
+_metrics_lock = threading.Lock()
+_metrics = {
+    "local": {"hits": 0, "misses": 0},
+    "redis": {"hits": 0, "misses": 0}
+}
+
+
+def get_local_cache() -> LocalCache | None:
+    global _local_cache
+    max_bytes = current_app.config["LOCAL_CACHE_MAX_BYTES"]
+
+    if max_bytes <= 0:
+        return None
+
+    if _local_cache is None:
+        _local_cache = LocalCache(max_bytes)
+
+    return _local_cache
+
+
+def get_version_key(key: str) -> str:
+    return f"version:{key}"
+
+
+def get_cached(
+    key: str, load: Callable[[Any], Any] | None = None
+) -> Any:
+    local_cache = get_local_cache()
+    # the version stamp is a few bytes, comparing it is enough to tell
+    # whether the copy held by this worker is still the current one
+    version = cache.get(get_version_key(key))
+
+    if local_cache is not None and version is not None:
+        value = local_cache.get(key, version)
+
+        if value is not None:
+            record_hit("local")
+            return value
+
+    record_miss("local")
+    payload = cache.get(key) if version is not None else None
+    value = None
+
+    if payload is not None:
+        value = load(payload) if load else payload
+
+    # a payload the loader cannot read counts as a miss and gets recomputed
+    if value is None:
+        record_miss("redis")
+        if local_cache is not None:
+            local_cache.discard(key)
+        return None
+
+    record_hit("redis")
+
+    if local_cache is not None:
+        local_cache.put(key, version, value, get_value_size(value))
+
+    return value
+
+
+def set_cached(
+    key: str,
+    value: Any,
+    timeout: int,
+    dump: Callable[[Any], Any] | None = None
+) -> None:
+    payload = dump(value) if dump else value
+    version = uuid.uuid4().hex
+    cache.set_many(
+        {key: payload, get_version_key(key): version}, timeout=timeout
+    )
+    local_cache = get_local_cache()
+
+    if local_cache is not None:
+        local_cache.put(key, version, value, get_value_size(value))
+
+
+def delete_cached(*keys: str) -> None:
+    cache.delete_many(*keys, *(get_version_key(key) for key in keys))
+    local_cache = get_local_cache()
+
+    if local_cache is not None:
+        for key in keys:
+            local_cache.discard(key)
+
+
+def get_value_size(value: Any) -> int:
+    # entries are charged by what they take in memory once decoded, which
+    # can be several times the size of their Redis payload
+    if hasattr(value, "memory_size"):
+        return value.memory_size()
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            get_value_size(key) + get_value_size(item)
+            for key, item in value.items()
+        )
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(map(get_value_size, value))
+
+    return sys.getsizeof(value)
+
+
+def record_hit(tier: str) -> None:
+    with _metrics_lock:
+        _metrics[tier]["hits"] += 1
+
+
+def record_miss(tier: str) -> None:
+    with _metrics_lock:
+        _metrics[tier]["misses"] += 1
+
+
+def get_tier_metrics() -> dict[str, dict[str, int]]:
+    with _metrics_lock:
+        return {tier: dict(counts) for tier, counts in _metrics.items()}
@@ -0,0 +1,25 @@
+import re
+from collections.abc import Iterator
+
+# Same pattern and preprocessing as the default analyzer of sklearn's
+# TfidfVectorizer (lowercase=True, token_pattern=r"(?u)\b\w\w+\b"), compiled
+# once per process instead of building a vectorizer on every call
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+# the capturing group makes split() keep the tokens between separators
+SPLIT_PATTERN = re.compile(r"(?u)(\b\w\w+\b)")
+
+
+def tokenize_text(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def split_with_separators(text: str) -> list[str]:
+    # tokens keep their case and the text between them is kept as is, so
+    # joining the parts gives back the original text
+    return [part for part in SPLIT_PATTERN.split(text) if part]
+
+
+def iter_tokens(text: str) -> Iterator[str]:
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        yield match.group()
+
@@ -1,6 +1,8 @@
 from flask_restx import Resource
 
 from app.system.namespace import api
+from app.shared.cache_fill import get_cache_fill_metrics
+from app.shared.tiered_cache import get_tier_metrics
 from app.system.services import get_uploads_count, get_largest_file
 from app.version import __version__
 
@@ -27,6 +29,8 @@ class MetricsResource(Resource):
         return {
             "uploads_count_per_day": get_uploads_count(),
             "largest_file_size_in_bytes": get_largest_file(),
+            "cache_fills": get_cache_fill_metrics(),
+            "cache_tiers": get_tier_metrics(),
         }, 200
 
 
@@ -6,19 +6,6 @@ from app.database import db
 from app.system.models import DocumentMetricModel
 
 
-def create_document_metrics(
-    document_id: int, word_count: int, size: int
-) -> DocumentMetricModel:
-    metric = DocumentMetricModel(
-        document_id=document_id, word_count=word_count, size=size
-    )
-
-    db.session.add(metric)
-    db.session.commit()
-
-    return metric
-
-
 def get_uploads_count() -> int:
     today = date.today()
     result = (
@@ -4,10 +4,11 @@ from collections import Counter
 import pandas as pd
 from flask import current_app
 from pandas import DataFrame
-from sklearn.feature_extraction.text import TfidfVectorizer
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from app.shared.scheduler import count_terms
+
 
 def get_table_data(file: FileStorage) -> list[dict[str, str | float | int]]:
     filename = secure_filename(file.filename)
@@ -26,21 +27,12 @@ def read_file(filepath: str) -> str:
 
 
 def create_df_from_text(text: str) -> DataFrame:
-    tokens = tokenize_text(text)
-    total_words = len(tokens)
-    word_counts = Counter(tokens)
+    word_counts, total_words = count_terms(text)
     table_data = calculate_tf_idf(word_counts, total_words)
 
     return get_sorted_df(table_data)
 
 
-def tokenize_text(text: str) -> list[str]:
-    vectorizer = TfidfVectorizer(use_idf=False, norm=None)
-    analyzer = vectorizer.build_analyzer()
-
-    return analyzer(text)
-
-
 def calculate_tf_idf(
     word_counts: Counter, total_words: int
 ) -> dict[str, list[str | float | int]]:
@@ -13,7 +13,7 @@ from app.users.decorators import authorize_user
 from app.users.namespace import api
 from app.users.services import (
     authenticate_user, generate_tokens, register_user, change_user_password,
-    remove_user
+    remove_user, current_user_id
 )
 
 
@@ -65,7 +65,7 @@ class RegisterResource(Resource):
         if not user:
             return {"message": "User with this username already exists"}, 409
 
-        tokens = generate_tokens(data["username"])
+        tokens = generate_tokens(user.username, user.id)
         response = {
             "message": f"User with id = {user.id} was created",
             "access_token": tokens["access_token"]
@@ -130,7 +130,7 @@ class UserResource(Resource):
             "message": "Password was updated. Tokens refreshed."
         }, 200)
         username = get_jwt_identity()
-        tokens = generate_tokens(username)
+        tokens = generate_tokens(username, user_id)
         set_access_cookies(response, tokens["access_token"])
 
         return response
@@ -179,7 +179,7 @@ class RefreshResource(Resource):
     def post(self):
         """Refresh the access token"""
         username = get_jwt_identity()
-        tokens = generate_tokens(username)
+        tokens = generate_tokens(username, current_user_id())
         response = make_response({
             "message": "Access token was refreshed"
         }, 200)
@@ -1,18 +1,14 @@
 from functools import wraps
 
-from flask_jwt_extended import get_jwt_identity
-
-from app.users.services import get_user_by_username
+from app.users.services import current_user_id
 
 
 def authorize_user(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         user_id = kwargs.get("user_id")
-        username = get_jwt_identity()
-        user = get_user_by_username(username)
 
-        if user is None or user.id != user_id:
+        if current_user_id() != user_id:
             return {
                 "message": "You are not authorized to perform this action"
             }, 403
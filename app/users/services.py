@@ -1,8 +1,13 @@
-from flask_jwt_extended import create_access_token, create_refresh_token
+from flask import g
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, get_jwt, get_jwt_identity
+)
 
 from app.database import db
 from app.users.models import UserModel
 
+USER_ID_CLAIM = "user_id"
+
 
 def register_user(username: str, password: str) -> None | UserModel:
     if get_user_by_username(username):
@@ -30,16 +35,35 @@ def authenticate_user(username: str, password: str) -> dict[str, str]:
     if not user.check_password(password):
         return {"message": "Invalid password"}
 
-    return generate_tokens(user.username)
+    return generate_tokens(user.username, user.id)
 
 
-def generate_tokens(username: str) -> dict[str, str]:
-    access_token = create_access_token(identity=username)
-    refresh_token = create_refresh_token(identity=username)
+def generate_tokens(username: str, user_id: int) -> dict[str, str]:
+    claims = {USER_ID_CLAIM: user_id}
+    access_token = create_access_token(
+        identity=username, additional_claims=claims
+    )
+    refresh_token = create_refresh_token(
+        identity=username, additional_claims=claims
+    )
 
     return {"access_token": access_token, "refresh_token": refresh_token}
 
 
+def current_user_id() -> int | None:
+    if "user_id" not in g:
+        user_id = get_jwt().get(USER_ID_CLAIM)
+
+        # tokens issued before the claim was added carry only the username
+        if user_id is None:
+            user = get_user_by_username(get_jwt_identity())
+            user_id = user.id if user is not None else None
+
+        g.user_id = user_id
+
+    return g.user_id
+
+
 def change_user_password(user_id: int, new_password: str) -> None | UserModel:
     user = get_user_by_id(user_id)
 
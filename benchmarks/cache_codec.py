@@ -0,0 +1,120 @@
+"""Compare cache payloads of the binary codec with pickle.
+
+Run from the repository root: python -m benchmarks.cache_codec
+"""
+import argparse
+import io
+import pickle
+
+import numpy as np
+from flask import Flask
+
+from benchmarks.common import (
+    format_size, format_time, get_zipfian_corpus, measure
+)
+from app.shared.codec import decode_term_values, encode_term_values
+from app.shared.term_matrix import VOCABULARY_SEPARATOR, TermMatrix
+
+COMPRESSIONS = ("none", "zlib", "lzma")
+
+
+def encode_savez_compressed(term_matrix: TermMatrix) -> bytes:
+    # term matrices were cached like this before the codec
+    vocabulary = VOCABULARY_SEPARATOR.join(term_matrix.vocabulary)
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        document_ids=term_matrix.document_ids,
+        vocabulary=np.frombuffer(vocabulary.encode("utf-8"), dtype=np.uint8),
+        data=term_matrix.counts.data,
+        indices=term_matrix.counts.indices,
+        indptr=term_matrix.counts.indptr,
+        shape=np.array(term_matrix.counts.shape, dtype=np.int64)
+    )
+
+    return buffer.getvalue()
+
+
+def benchmark_pickle(value, repeat: int) -> tuple[int, float, float]:
+    payload, encode_time = measure(
+        lambda: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), repeat
+    )
+    _, decode_time = measure(lambda: pickle.loads(payload), repeat)
+
+    return len(payload), encode_time, decode_time
+
+
+def benchmark_codec(
+    value, dump, load, repeat: int
+) -> tuple[int, float, float]:
+    payload, encode_time = measure(lambda: dump(value), repeat)
+    _, decode_time = measure(lambda: load(payload), repeat)
+
+    return len(payload), encode_time, decode_time
+
+
+def print_row(name: str, size: int, encode_time: float, decode_time=None):
+    decode = f"decode {format_time(decode_time)}" if decode_time else ""
+    print(f"{name:<36} {format_size(size):>10}   "
+          f"encode {format_time(encode_time):>9}   {decode}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    term_matrix = TermMatrix.from_documents_terms(get_zipfian_corpus(
+        args.documents, args.tokens, args.vocabulary, args.seed
+    ))
+    tf = term_matrix.get_least_frequent_tf()
+    full_tf = dict(zip(
+        term_matrix.vocabulary, term_matrix.term_frequencies().tolist()
+    ))
+    print(f"{term_matrix}, best of {args.repeat} runs\n")
+
+    payload, encode_time = measure(
+        lambda: encode_savez_compressed(term_matrix), args.repeat
+    )
+    print_row("matrix, savez_compressed", len(payload), encode_time)
+    print_row("matrix, pickle", *benchmark_pickle(term_matrix, args.repeat))
+
+    app = Flask(__name__)
+
+    for compression in COMPRESSIONS:
+        app.config["CACHE_COMPRESSION"] = compression
+
+        with app.app_context():
+            print_row(f"matrix, codec {compression}", *benchmark_codec(
+                term_matrix, TermMatrix.to_bytes, TermMatrix.from_bytes,
+                args.repeat
+            ))
+
+    tf_repeat = args.repeat * 1000
+    print_row(
+        f"tf ({len(tf)} terms), pickle", *benchmark_pickle(tf, tf_repeat)
+    )
+    print_row(f"full tf ({len(full_tf)} terms), pickle",
+              *benchmark_pickle(full_tf, args.repeat))
+
+    for compression in COMPRESSIONS:
+        app.config["CACHE_COMPRESSION"] = compression
+
+        with app.app_context():
+            print_row(f"tf ({len(tf)} terms), codec {compression}",
+                      *benchmark_codec(
+                          tf, encode_term_values, decode_term_values,
+                          tf_repeat
+                      ))
+            print_row(f"full tf, codec {compression}", *benchmark_codec(
+                full_tf, encode_term_values, decode_term_values,
+                args.repeat
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+# app.config reads these at import time, the values only need to be valid
+os.environ.setdefault("FLASK_ENV", "test")
+os.environ.setdefault("FLASK_SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-jwt-secret-key-" + "x" * 32)
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRES_MINUTES", "15")
+os.environ.setdefault("JWT_REFRESH_TOKEN_EXPIRES_DAYS", "30")
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def get_zipfian_corpus(
+    documents: int, tokens: int, vocabulary_size: int, seed: int
+) -> list[tuple[int, dict[str, int]]]:
+    # no production data is available, so documents draw their tokens from
+    # a Zipfian vocabulary, which is how word frequencies are distributed
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choices(LETTERS, k=rng.randint(3, 11)))
+        for _ in range(vocabulary_size)
+    ]
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+
+    return [
+        (
+            document_id,
+            dict(Counter(rng.choices(vocabulary, weights=weights, k=tokens)))
+        )
+        for document_id in range(documents)
+    ]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> tuple[Any, float]:
+    # best of the runs, in seconds, is the least disturbed by other load
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+
+    return f"{size / 1024 / 1024:.2f} MiB"
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+
+    if seconds < 1:
+        return f"{seconds * 1e3:.0f} ms"
+
+    return f"{seconds:.2f} s"
@@ -0,0 +1,147 @@
+"""Compare Huffman trees in parallel arrays with one object per node.
+
+Run from the repository root: python -m benchmarks.huffman_tree
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import heapq
+import random
+import tracemalloc
+
+from benchmarks.common import format_size, format_time, measure
+from app.documents.services import huffman
+
+
+class HuffmanNode:
+    # trees were built from these nodes before HuffmanTree
+    def __init__(
+        self,
+        frequency: int,
+        data: str | None,
+        left: HuffmanNode | None = None,
+        right: HuffmanNode | None = None
+    ) -> None:
+        self.frequency = frequency
+        self.data = data
+        self.left = left
+        self.right = right
+
+    def __lt__(self, other: HuffmanNode) -> bool:
+        return self.frequency < other.frequency
+
+
+def generate_node_tree(mappings: dict[str, int]) -> HuffmanNode:
+    heap = [HuffmanNode(freq, char) for char, freq in mappings.items()]
+    heapq.heapify(heap)
+
+    while len(heap) > 1:
+        first = heapq.heappop(heap)
+        second = heapq.heappop(heap)
+        heapq.heappush(heap, HuffmanNode(
+            first.frequency + second.frequency, None, first, second
+        ))
+
+    return heap[0]
+
+
+def get_node_code_lengths(root: HuffmanNode) -> dict[str, int]:
+    if root.left is None and root.right is None:
+        return {root.data: 1}
+
+    code_lengths = {}
+    stack = [(root, 0)]
+
+    while stack:
+        node, depth = stack.pop()
+
+        if node.left is None and node.right is None:
+            code_lengths[node.data] = depth
+            continue
+
+        stack.append((node.left, depth + 1))
+        stack.append((node.right, depth + 1))
+
+    return code_lengths
+
+
+IMPLEMENTATIONS = (
+    ("nodes", generate_node_tree, get_node_code_lengths),
+    ("arrays", huffman.generate_huffman_tree, huffman.get_code_lengths),
+)
+
+
+def get_unicode_alphabet(size: int, seed: int) -> dict[str, int]:
+    rng = random.Random(seed)
+    code_points = (
+        code_point for code_point in range(0x20, 0x110000)
+        if not 0xd800 <= code_point < 0xe000
+    )
+
+    return {
+        chr(code_point): rng.randint(1, 1000)
+        for code_point, _ in zip(code_points, range(size))
+    }
+
+
+def get_word_alphabet(size: int) -> dict[str, int]:
+    # Zipfian frequencies, as words of a text have
+    return {
+        f"w{rank}": max(1, 1_000_000 // (rank + 1)) for rank in range(size)
+    }
+
+
+def get_tree_memory(generate_tree, mappings: dict[str, int]) -> int:
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        tree = generate_tree(mappings)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del tree
+
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=100_000)
+    parser.add_argument("--words", type=int, nargs="+",
+                        default=[200_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    alphabets = [(
+        f"{args.characters} Unicode characters",
+        get_unicode_alphabet(args.characters, args.seed)
+    )]
+    alphabets.extend(
+        (f"{size} word alphabet", get_word_alphabet(size))
+        for size in args.words
+    )
+    print(f"best of {args.repeat} runs, tree memory traced by tracemalloc\n")
+
+    for name, mappings in alphabets:
+        for label, generate_tree, get_code_lengths in IMPLEMENTATIONS:
+            gc.collect()
+            tree, build_time = measure(
+                lambda: generate_tree(mappings), args.repeat
+            )
+            _, lengths_time = measure(
+                lambda: get_code_lengths(tree), args.repeat
+            )
+            tree = None
+            tree_memory = get_tree_memory(generate_tree, mappings)
+            print(f"{name:<28} {label:<7} "
+                  f"build {format_time(build_time):>8}   "
+                  f"lengths {format_time(lengths_time):>8}   "
+                  f"tree {format_size(tree_memory):>10}")
+
+
+if __name__ == "__main__":
+    main()
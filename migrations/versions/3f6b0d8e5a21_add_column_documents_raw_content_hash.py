@@ -0,0 +1,68 @@
+"""Add column documents.raw_content_hash and backfill it
+
+Revision ID: 3f6b0d8e5a21
+Revises: 9a4d2e6b7c10
+Create Date: 2026-10-18 16:21:37.604118
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6b0d8e5a21'
+down_revision = '9a4d2e6b7c10'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 100
+
+
+def upgrade():
+    op.add_column('documents', sa.Column('raw_content_hash', sa.String(length=64), nullable=True))
+
+    backfill_raw_content_hash()
+
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.alter_column(
+            'raw_content_hash', existing_type=sa.String(length=64), nullable=False
+        )
+
+
+def backfill_raw_content_hash():
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Integer),
+        sa.column('contents', sa.Text),
+        sa.column('raw_content_hash', sa.String)
+    )
+
+    connection = op.get_bind()
+    result = connection.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(
+        sa.select(documents.c.id, documents.c.contents)
+    )
+    # hashes are small, so they are collected first and the updates run
+    # after the select has finished streaming
+    hashes = [
+        {
+            'document_id': document_id,
+            'raw_content_hash': hashlib.sha256(contents.encode('utf-8')).hexdigest()
+        }
+        for partition in result.partitions()
+        for document_id, contents in partition
+    ]
+
+    if hashes:
+        connection.execute(
+            documents.update()
+            .where(documents.c.id == sa.bindparam('document_id'))
+            .values(raw_content_hash=sa.bindparam('raw_content_hash')),
+            hashes
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('raw_content_hash')
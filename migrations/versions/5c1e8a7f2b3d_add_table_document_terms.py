@@ -0,0 +1,75 @@
+"""Add table document_terms and backfill it for existing documents
+
+Revision ID: 5c1e8a7f2b3d
+Revises: d922cb4a9a28
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+import re
+from collections import Counter
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e8a7f2b3d'
+down_revision = 'd922cb4a9a28'
+branch_labels = None
+depends_on = None
+
+# kept in sync with app/shared/tokenizer.py at the time of this revision
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+BACKFILL_BATCH_SIZE = 100
+
+
+def upgrade():
+    op.create_table('document_terms',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('term_counts', sa.JSON(), nullable=False),
+    sa.Column('total_terms', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id')
+    )
+
+    backfill_document_terms()
+
+
+def backfill_document_terms():
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Integer),
+        sa.column('contents', sa.Text)
+    )
+    document_terms = sa.table(
+        'document_terms',
+        sa.column('document_id', sa.Integer),
+        sa.column('term_counts', sa.JSON),
+        sa.column('total_terms', sa.Integer),
+        sa.column('created_at', sa.DateTime)
+    )
+
+    connection = op.get_bind()
+    result = connection.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(
+        sa.select(documents.c.id, documents.c.contents)
+    )
+
+    for partition in result.partitions():
+        rows = []
+        for document_id, contents in partition:
+            tokens = TOKEN_PATTERN.findall(contents.lower())
+            rows.append({
+                'document_id': document_id,
+                'term_counts': dict(Counter(tokens)),
+                'total_terms': len(tokens),
+                'created_at': datetime.utcnow()
+            })
+        op.bulk_insert(document_terms, rows)
+
+
+def downgrade():
+    op.drop_table('document_terms')
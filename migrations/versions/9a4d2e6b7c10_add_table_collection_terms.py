@@ -0,0 +1,86 @@
+"""Add table collection_terms and backfill it from document_terms
+
+Revision ID: 9a4d2e6b7c10
+Revises: 5c1e8a7f2b3d
+Create Date: 2026-10-18 13:47:05.519862
+
+"""
+from collections import Counter
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4d2e6b7c10'
+down_revision = '5c1e8a7f2b3d'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 100
+
+
+def upgrade():
+    op.create_table('collection_terms',
+    sa.Column('collection_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.Text(), nullable=False),
+    sa.Column('document_frequency', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('collection_id', 'term')
+    )
+
+    backfill_collection_terms()
+
+
+def backfill_collection_terms():
+    documents_collections = sa.table(
+        'documents_collections',
+        sa.column('document_id', sa.Integer),
+        sa.column('collection_id', sa.Integer)
+    )
+    document_terms = sa.table(
+        'document_terms',
+        sa.column('document_id', sa.Integer),
+        sa.column('term_counts', sa.JSON)
+    )
+    collection_terms = sa.table(
+        'collection_terms',
+        sa.column('collection_id', sa.Integer),
+        sa.column('term', sa.Text),
+        sa.column('document_frequency', sa.Integer)
+    )
+
+    connection = op.get_bind()
+    result = connection.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(
+        sa.select(
+            documents_collections.c.collection_id,
+            document_terms.c.term_counts
+        )
+        .join(
+            document_terms,
+            document_terms.c.document_id == documents_collections.c.document_id
+        )
+        .order_by(documents_collections.c.collection_id)
+    )
+
+    for collection_id, rows in groupby(result, key=lambda row: row[0]):
+        document_frequencies = Counter()
+        for _, term_counts in rows:
+            document_frequencies.update(term_counts.keys())
+
+        if not document_frequencies:
+            continue
+
+        op.bulk_insert(collection_terms, [
+            {
+                'collection_id': collection_id,
+                'term': term,
+                'document_frequency': df
+            }
+            for term, df in document_frequencies.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('collection_terms')
@@ -0,0 +1,25 @@
+"""Add index on documents (user_id, created_at, id) for keyset pagination
+
+Revision ID: b7e2c4a91d58
+Revises: 3f6b0d8e5a21
+Create Date: 2026-10-18 18:05:12.447391
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4a91d58'
+down_revision = '3f6b0d8e5a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index('ix_documents_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_user_id_created_at_id')
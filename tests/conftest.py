@@ -0,0 +1,74 @@
+import io
+import os
+
+import pytest
+from sqlalchemy import event
+
+# app.config reads these at import time, the values only need to be valid
+os.environ["FLASK_ENV"] = "test"
+os.environ.setdefault("FLASK_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key-" + "x" * 32)
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRES_MINUTES", "15")
+os.environ.setdefault("JWT_REFRESH_TOKEN_EXPIRES_DAYS", "30")
+
+from app import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config["MEDIA_FOLDER"] = str(tmp_path)
+
+    with app.app_context():
+        db.create_all()
+
+    # no app context is kept around the test, every request gets its own
+    # one, so nothing memoized in flask.g leaks between requests
+    yield app
+
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def queries(app):
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record_statement)
+
+
+@pytest.fixture
+def auth_headers(client):
+    return register_user(client, "user")
+
+
+def register_user(client, username):
+    response = client.post(
+        "/api/users/register",
+        json={"username": username, "password": "password"}
+    )
+
+    return {"Authorization": f"Bearer {response.json['access_token']}"}
+
+
+def upload_document(client, headers, filename, text):
+    return client.post(
+        "/api/documents",
+        headers=headers,
+        data={"file": (io.BytesIO(text.encode("utf-8")), filename)},
+        content_type="multipart/form-data"
+    )
@@ -0,0 +1,133 @@
+import pytest
+
+from tests.conftest import register_user, upload_document
+
+
+def create_collections(client, headers, number_of_collections):
+    for index in range(number_of_collections):
+        client.post(
+            "/api/collections",
+            headers=headers,
+            json={"collection_name": f"collection {index}"}
+        )
+        upload_document(
+            client, headers, f"document{index}.txt", f"text number {index}"
+        )
+        client.post(
+            f"/api/collections/{index + 1}/{index + 1}", headers=headers
+        )
+        client.post(f"/api/collections/{index + 1}/1", headers=headers)
+
+
+def get_collection_ids(response):
+    return [collection["collection_id"] for collection in response.json]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 10])
+def test_collections_listing_takes_two_queries(
+    client, auth_headers, queries, limit
+):
+    create_collections(client, auth_headers, 6)
+    queries.clear()
+
+    response = client.get(
+        f"/api/collections?limit={limit}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert len(response.json) == min(limit, 6)
+    assert len(queries) == 2
+
+
+def test_collections_listing_pages_by_cursor(client, auth_headers):
+    create_collections(client, auth_headers, 3)
+
+    first_page = client.get("/api/collections?limit=2", headers=auth_headers)
+    next_after = first_page.headers["X-Next-After"]
+    last_page = client.get(
+        f"/api/collections?limit=2&after={next_after}", headers=auth_headers
+    )
+
+    assert get_collection_ids(first_page) == [1, 2]
+    assert get_collection_ids(last_page) == [3]
+    assert "X-Next-After" not in last_page.headers
+    assert len(last_page.json[0]["documents"]) == 2
+
+
+def get_statement_types(queries):
+    return [statement.split()[0] for statement in queries]
+
+
+@pytest.fixture
+def other_headers(client, auth_headers):
+    # the user gets collection 1 and document 1, the other user document 2
+    client.post(
+        "/api/collections",
+        headers=auth_headers,
+        json={"collection_name": "collection"}
+    )
+    upload_document(client, auth_headers, "first.txt", "the cat sat")
+    other_headers = register_user(client, "other")
+    upload_document(client, other_headers, "other.txt", "other text")
+
+    return other_headers
+
+
+def test_adding_document_authorizes_in_one_query(
+    client, auth_headers, other_headers, queries
+):
+    queries.clear()
+
+    response = client.post("/api/collections/1/1", headers=auth_headers)
+
+    assert response.status_code == 201
+    # one authorization query, then the link and the term index upsert,
+    # which reads the stored term counts of the document
+    assert get_statement_types(queries) == [
+        "SELECT", "INSERT", "SELECT", "INSERT"
+    ]
+
+
+def test_removing_document_authorizes_in_one_query(
+    client, auth_headers, other_headers, queries
+):
+    client.post("/api/collections/1/1", headers=auth_headers)
+    queries.clear()
+
+    response = client.delete("/api/collections/1/1", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert get_statement_types(queries) == [
+        "SELECT", "DELETE", "SELECT", "UPDATE", "DELETE"
+    ]
+
+
+@pytest.mark.parametrize("method, url, status_code, user", [
+    ("post", "/api/collections/9/1", 404, "user"),
+    ("post", "/api/collections/1/2", 404, "user"),
+    ("post", "/api/collections/1/1", 404, "other"),
+    ("delete", "/api/collections/1/1", 409, "user"),
+])
+def test_rejected_document_change_takes_one_query(
+    client, auth_headers, other_headers, queries, method, url,
+    status_code, user
+):
+    headers = auth_headers if user == "user" else other_headers
+    queries.clear()
+
+    response = getattr(client, method)(url, headers=headers)
+
+    assert response.status_code == status_code
+    assert len(queries) == 1
+
+
+def test_adding_linked_document_takes_one_query(
+    client, auth_headers, other_headers, queries
+):
+    client.post("/api/collections/1/1", headers=auth_headers)
+    queries.clear()
+
+    response = client.post("/api/collections/1/1", headers=auth_headers)
+
+    assert response.status_code == 409
+    assert len(queries) == 1
@@ -0,0 +1,88 @@
+import io
+import zipfile
+
+from app.collections.models import CollectionTermModel
+from app.database import db
+from tests.conftest import upload_document
+
+
+def get_document_frequencies(app, collection_id):
+    with app.app_context():
+        terms = db.session.query(
+            CollectionTermModel.term, CollectionTermModel.document_frequency
+        ).filter(CollectionTermModel.collection_id == collection_id)
+
+        return dict(terms)
+
+
+def create_zip(files):
+    archive = io.BytesIO()
+
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        for filename, text in files.items():
+            zip_file.writestr(filename, text)
+
+    archive.seek(0)
+    return archive
+
+
+def test_bulk_upload_counts_document_frequency_once_per_document(
+    app, client, auth_headers
+):
+    client.post(
+        "/api/collections",
+        headers=auth_headers,
+        json={"collection_name": "collection"}
+    )
+
+    response = client.post(
+        "/api/documents/bulk",
+        headers=auth_headers,
+        data={
+            "files": [
+                (io.BytesIO(b"the " * 5 + b"cat"), "first.txt"),
+                (create_zip({"second.txt": "the " * 3 + "dog"}), "more.zip")
+            ],
+            "collection_id": 1
+        },
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 201
+    assert response.json["uploaded"] == 2
+    assert get_document_frequencies(app, 1) == {
+        "the": 2, "cat": 1, "dog": 1
+    }
+
+    client.delete("/api/collections/1/1", headers=auth_headers)
+
+    assert get_document_frequencies(app, 1) == {"the": 1, "dog": 1}
+
+
+def test_deleting_document_reads_its_terms_once(
+    app, client, auth_headers, queries
+):
+    upload_document(client, auth_headers, "first.txt", "the cat sat")
+    upload_document(client, auth_headers, "second.txt", "the dog sat")
+
+    for collection_id in (1, 2):
+        client.post(
+            "/api/collections",
+            headers=auth_headers,
+            json={"collection_name": f"collection {collection_id}"}
+        )
+        for document_id in (1, 2):
+            client.post(
+                f"/api/collections/{collection_id}/{document_id}",
+                headers=auth_headers
+            )
+    queries.clear()
+
+    response = client.delete("/api/documents/1", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert sum("FROM document_terms" in query for query in queries) == 1
+    for collection_id in (1, 2):
+        assert get_document_frequencies(app, collection_id) == {
+            "the": 1, "dog": 1, "sat": 1
+        }
@@ -0,0 +1,172 @@
+import base64
+
+import pytest
+
+from app.documents.services.huffman import (
+    MODES, HuffmanEncoding, decode_packed, deserialize_encoding,
+    encode_packed, generate_codebook, get_symbols, serialize_encoding,
+    unpack_bits
+)
+from app.shared.exceptions import InvalidHuffmanPayloadError
+from tests.conftest import upload_document
+
+
+def get_skewed_text():
+    # fibonacci frequencies give the deepest possible tree, so most codes
+    # are longer than the lookup table and take the long code path
+    frequencies = [1, 1]
+    while len(frequencies) < 20:
+        frequencies.append(frequencies[-1] + frequencies[-2])
+
+    return "".join(
+        chr(ord("a") + index) * frequency
+        for index, frequency in enumerate(frequencies)
+    )
+
+
+TEXTS = {
+    "empty": "",
+    "single symbol": "a",
+    "single repeated symbol": "aaaaaaaaa",
+    "unicode": "Zażółć gęślą jaźń, 中文文本 🙂🙂 ǅemal\r\n\tİstanbul",
+    "skewed": get_skewed_text(),
+    "words": "the cat and the hat, the end. " * 50 + "don't stop-believing"
+}
+
+
+def get_decode_request(encoding):
+    return {
+        "encoded_contents": base64.b64encode(encoding.packed).decode("ascii"),
+        "bit_length": encoding.bit_length,
+        "code_lengths": encoding.code_lengths
+    }
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("text", TEXTS.values(), ids=TEXTS.keys())
+def test_round_trip(text, mode):
+    encoding = encode_packed(text, mode)
+
+    assert decode_packed(encoding) == text
+    assert decode_packed(
+        deserialize_encoding(serialize_encoding(encoding))
+    ) == text
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("text", TEXTS.values(), ids=TEXTS.keys())
+def test_unpacked_bits_join_symbol_codes(text, mode):
+    encoding = encode_packed(text, mode)
+    codebook = generate_codebook(encoding.code_lengths)
+
+    assert unpack_bits(encoding) == "".join(
+        codebook[symbol] for symbol in get_symbols(text, mode)
+    )
+
+
+def test_skewed_text_uses_long_codes():
+    encoding = encode_packed(TEXTS["skewed"])
+
+    assert max(encoding.code_lengths.values()) == 19
+
+
+def test_word_mode_uses_tokens_and_separators():
+    encoding = encode_packed("the cat, the hat", "word")
+
+    assert set(encoding.code_lengths) == {"the", "cat", ", ", " ", "hat"}
+
+
+def test_decode_round_trips_document_encoding(client, auth_headers):
+    text = TEXTS["unicode"] + " " + TEXTS["words"]
+    upload_document(client, auth_headers, "document.txt", text)
+
+    for mode in MODES:
+        encoding = client.get(
+            f"/api/documents/1/huffman?mode={mode}", headers=auth_headers
+        ).json
+        response = client.post(
+            "/api/documents/huffman/decode",
+            headers=auth_headers,
+            json=encoding
+        )
+
+        assert response.json["decoded_contents"] == text
+
+
+def test_incomplete_code_table_is_rejected():
+    # "b" takes one long code and the other long patterns have no symbol
+    encoding = HuffmanEncoding(b"\x80", 1, {"a": 1, "b": 64})
+
+    with pytest.raises(InvalidHuffmanPayloadError):
+        decode_packed(encoding)
+
+
+def test_code_running_past_bit_length_is_rejected():
+    encoding = HuffmanEncoding(b"\xff\xff", 9, {"a": 1, "b": 20})
+
+    with pytest.raises(InvalidHuffmanPayloadError):
+        decode_packed(encoding)
+
+
+def test_decoded_size_is_limited_while_decoding():
+    encoding = HuffmanEncoding(b"\x00" * 4, 32, {"x" * 100: 1, "y": 1})
+
+    assert len(decode_packed(encoding, max_size=3200)) == 3200
+    with pytest.raises(InvalidHuffmanPayloadError):
+        decode_packed(encoding, max_size=3199)
+
+
+def test_decoded_size_is_checked_before_decoding():
+    encoding = HuffmanEncoding(b"\x00" * 1024, 8192, {"ab": 1, "cd": 1})
+
+    with pytest.raises(InvalidHuffmanPayloadError, match="would exceed"):
+        decode_packed(encoding, max_size=16383)
+
+
+def test_empty_symbol_is_rejected():
+    encoding = HuffmanEncoding(b"\x00" * 1024, 8192, {"": 1, "a": 1})
+
+    with pytest.raises(InvalidHuffmanPayloadError, match="empty symbol"):
+        decode_packed(encoding, max_size=16383)
+
+
+def test_decode_rejects_incomplete_code_table(client, auth_headers):
+    response = client.post(
+        "/api/documents/huffman/decode",
+        headers=auth_headers,
+        json=get_decode_request(
+            HuffmanEncoding(b"\x80", 1, {"a": 1, "b": 64})
+        )
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("body", [[], ["encoded_contents"], "text", 1])
+def test_decode_rejects_json_that_is_not_an_object(
+    client, auth_headers, body
+):
+    response = client.post(
+        "/api/documents/huffman/decode", headers=auth_headers, json=body
+    )
+
+    assert response.status_code == 400
+
+
+def test_decode_rejects_output_over_content_limit(client, auth_headers):
+    # 1 KB of zero bits repeats a 100 KB symbol 8192 times
+    encoding = HuffmanEncoding(b"\x00" * 1024, 8192, {"w" * 100_000: 1})
+    json_response = client.post(
+        "/api/documents/huffman/decode",
+        headers=auth_headers,
+        json=get_decode_request(encoding)
+    )
+    binary_response = client.post(
+        "/api/documents/huffman/decode",
+        headers=auth_headers,
+        data=serialize_encoding(encoding),
+        content_type="application/octet-stream"
+    )
+
+    assert json_response.status_code == 400
+    assert binary_response.status_code == 400
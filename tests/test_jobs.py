@@ -0,0 +1,61 @@
+import time
+
+from app.extensions import cache
+from app.jobs.services import JOB_HEARTBEAT_TIMEOUT, get_job, save_job
+from app.shared.generations import get_collection_generation
+
+
+def save_stale_job(app, job_id, username="user"):
+    with app.app_context():
+        save_job({
+            "job_id": job_id,
+            "username": username,
+            "status": "running",
+            "progress": 0.5
+        })
+        job = get_job(job_id)
+        job["updated_at"] = time.time() - JOB_HEARTBEAT_TIMEOUT - 1
+        cache.set(f"job:{job_id}", job)
+
+
+def test_job_without_heartbeat_is_reported_failed(app, client, auth_headers):
+    save_stale_job(app, "stale")
+
+    response = client.get("/api/jobs/stale", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json["status"] == "failed"
+
+
+def test_job_with_recent_heartbeat_keeps_its_status(app, client, auth_headers):
+    with app.app_context():
+        save_job({
+            "job_id": "alive",
+            "username": "user",
+            "status": "running",
+            "progress": 0.5
+        })
+
+    response = client.get("/api/jobs/alive", headers=auth_headers)
+
+    assert response.json["status"] == "running"
+
+
+def test_stale_statistics_job_is_replaced(app, client, auth_headers):
+    client.post(
+        "/api/collections",
+        headers=auth_headers,
+        json={"collection_name": "collection"}
+    )
+    save_stale_job(app, "stale")
+
+    with app.app_context():
+        generation = get_collection_generation(1)
+        cache.set(f"collection_stats_job:1:{generation}", "stale")
+
+    response = client.get(
+        "/api/collections/1/statistics?async=true", headers=auth_headers
+    )
+
+    assert response.status_code == 202
+    assert response.json["job_id"] != "stale"
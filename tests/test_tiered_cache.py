@@ -0,0 +1,112 @@
+import random
+import tracemalloc
+
+import pytest
+from flask import Flask
+
+from app.extensions import RedisClient, cache
+from app.shared import tiered_cache
+from app.shared.codec import decode_term_values, encode_term_values
+from app.shared.term_matrix import TermMatrix
+from app.shared.tiered_cache import get_cached, get_value_size, set_cached
+
+
+@pytest.fixture
+def local_cache(app, monkeypatch):
+    monkeypatch.setattr(tiered_cache, "_local_cache", None)
+
+    with app.app_context():
+        yield tiered_cache.get_local_cache()
+
+
+def get_term_matrix():
+    rng = random.Random(2024)
+    vocabulary = [f"term{index}" for index in range(5000)]
+
+    return TermMatrix.from_documents_terms(
+        (
+            document_id,
+            {
+                term: rng.randint(1, 9)
+                for term in rng.sample(vocabulary, 100)
+            }
+        )
+        for document_id in range(200)
+    )
+
+
+def load_from_redis(key, load):
+    # the local copy is dropped so the value is decoded from the payload
+    tiered_cache.get_local_cache().discard(key)
+    return get_cached(key, load)
+
+
+def test_decoded_term_matrix_is_charged_at_decoded_size(local_cache):
+    set_cached("matrix", get_term_matrix(), 60, dump=TermMatrix.to_bytes)
+    term_matrix = load_from_redis("matrix", TermMatrix.from_bytes)
+    payload_size = len(cache.get("matrix"))
+
+    assert local_cache.entries["matrix"][2] == term_matrix.memory_size()
+    assert local_cache.size == term_matrix.memory_size()
+    assert term_matrix.memory_size() > payload_size
+
+
+def test_term_matrix_memory_size_matches_allocations(local_cache):
+    payload = get_term_matrix().to_bytes()
+
+    tracemalloc.start()
+    try:
+        term_matrix = TermMatrix.from_bytes(payload)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert 0.8 < term_matrix.memory_size() / allocated < 1.25
+
+
+def test_decoded_term_values_are_charged_per_entry(local_cache):
+    term_values = {f"term{index}": index / 1000 for index in range(1000)}
+    set_cached("tf", term_values, 60, dump=encode_term_values)
+    decoded_values = load_from_redis("tf", decode_term_values)
+    payload_size = len(cache.get("tf"))
+
+    assert decoded_values == term_values
+    assert local_cache.entries["tf"][2] == get_value_size(decoded_values)
+    assert get_value_size(decoded_values) > 2 * payload_size
+
+
+def test_entries_over_budget_are_evicted_by_decoded_size(local_cache):
+    term_matrix = get_term_matrix()
+    local_cache.max_bytes = term_matrix.memory_size() * 3 // 2
+
+    for key in ("first", "second"):
+        set_cached(key, term_matrix, 60, dump=TermMatrix.to_bytes)
+
+    assert list(local_cache.entries) == ["second"]
+
+
+def test_redis_client_is_required_outside_test_config():
+    app = Flask(__name__)
+    app.config["CACHE_TYPE"] = "SimpleCache"
+
+    with pytest.raises(RuntimeError):
+        RedisClient().init_app(app)
+
+
+def test_redis_client_is_built_from_cache_settings():
+    app = Flask(__name__)
+    app.config.update(
+        CACHE_TYPE="RedisCache",
+        CACHE_REDIS_HOST="redis.internal",
+        CACHE_REDIS_PORT="6380"
+    )
+    redis_client = RedisClient()
+    redis_client.init_app(app)
+
+    with app.app_context():
+        connection_kwargs = (
+            redis_client.client.connection_pool.connection_kwargs
+        )
+
+    assert connection_kwargs["host"] == "redis.internal"
+    assert connection_kwargs["port"] == 6380
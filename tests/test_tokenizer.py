@@ -0,0 +1,73 @@
+import random
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.shared.tfidf_stats import get_file_word_stats, get_word_stats
+from app.shared.tokenizer import (
+    iter_tokens, split_with_separators, tokenize_text
+)
+
+SAMPLES = [
+    "",
+    "a",
+    "Hello, World! Hello again.",
+    "don't stop-believing; e-mail me at john_doe@example.com",
+    "ÉCOLE élève Straße STRASSE İstanbul ǅemal",
+    "числа 123 и 4,5 и x2 и 2x",
+    "中文文本 日本語のテキスト 한국어 텍스트",
+    "tabs\tand\nnew\r\nlines  and   spaces",
+    "emoji 🙂🙂 stay out, but wörds_with_underscores stay in",
+    "combining marks: café naïve",
+    "superscripts x² and fractions ½ and digits ٣٤",
+]
+ALPHABET = (
+    "abcXYZ019_ '-.,;\n\tÀéßçØıİ́̈Σσς€½²٣中あ한🙂​ "
+)
+
+
+def get_sklearn_tokens(text: str) -> list[str]:
+    return TfidfVectorizer().build_analyzer()(text)
+
+
+def get_random_texts(count: int, seed: int = 2024) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 200)))
+        for _ in range(count)
+    ]
+
+
+TEXTS = SAMPLES + get_random_texts(300)
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=range(len(TEXTS)))
+def test_tokens_match_sklearn_analyzer(text):
+    assert tokenize_text(text) == get_sklearn_tokens(text)
+
+
+@pytest.mark.parametrize("text", SAMPLES, ids=range(len(SAMPLES)))
+def test_iter_tokens_matches_tokenize_text(text):
+    assert list(iter_tokens(text)) == tokenize_text(text)
+
+
+@pytest.mark.parametrize("text", SAMPLES, ids=range(len(SAMPLES)))
+def test_word_stats_count_analyzer_tokens(text):
+    word_counts, total_words = get_word_stats(text)
+    tokens = get_sklearn_tokens(text)
+
+    assert total_words == len(tokens)
+    assert sorted(word_counts.elements()) == sorted(tokens)
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=range(len(TEXTS)))
+def test_file_word_stats_match_word_stats(text, tmp_path):
+    file_path = tmp_path / "document.txt"
+    file_path.write_bytes(text.encode("utf-8"))
+
+    assert get_file_word_stats(str(file_path)) == get_word_stats(text)
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=range(len(TEXTS)))
+def test_split_with_separators_is_lossless(text):
+    assert "".join(split_with_separators(text)) == text